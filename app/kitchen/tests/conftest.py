@@ -2,6 +2,7 @@ import pytest
 from decimal import Decimal
 
 from django.conf import settings
+from django.db import connection
 from django.urls import reverse
 from model_bakery import baker
 from rest_framework.test import APIClient
@@ -24,6 +25,9 @@ def pytest_configure():
 def django_db_modify_db_settings():
     """Use a separate test database — config stays here, not in dev.py."""
     db_name = settings.DATABASES['default'].get('NAME', 'database')
+    if connection.creation.is_in_memory_db(db_name):
+        # taypa.settings.test: already a throwaway database built from the models
+        return
     settings.DATABASES['default']['TEST'] = {
         'NAME': f'test_{db_name}',
         'MIRROR': None,
@@ -38,7 +42,7 @@ def enforce_test_database(django_db_setup, django_db_blocker):
     """Refuse to run tests against the development database."""
     with django_db_blocker.unblock():
         db_name = settings.DATABASES['default']['NAME']
-        if not db_name.startswith('test_'):
+        if not db_name.startswith('test_') and not connection.creation.is_in_memory_db(db_name):
             pytest.fail(
                 f'Refusing to run tests on database "{db_name}". '
                 'pytest-django should use the test_* database, not your dev database.'
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-17 02:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('taxes', '0002_alter_document_serie'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='document',
+            index=models.Index(fields=['document_type', '-created_at'], name='doc_type_created_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-17 02:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('taxes', '0003_document_doc_type_created_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='document',
+            index=models.Index(fields=['-created_at'], name='doc_created_idx'),
+        ),
+    ]
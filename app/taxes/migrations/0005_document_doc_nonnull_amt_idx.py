@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-17 02:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('taxes', '0004_document_doc_created_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='document',
+            index=models.Index(condition=models.Q(('amount__isnull', False)), fields=['created_at'], name='doc_nonnull_amt_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-17 03:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('taxes', '0005_document_doc_nonnull_amt_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='document',
+            index=models.Index(fields=['-sunat_issue_time', '-created_at'], name='doc_sort_idx'),
+        ),
+    ]
@@ -10,6 +10,7 @@ from django.db import models
 from django.core.validators import MinValueValidator
 from django.utils import timezone
 import uuid
+from types import MappingProxyType
 
 # {
   
@@ -195,6 +196,13 @@ class Document(models.Model):
         ('failed', 'Fallido'),
     ]
     
+    # Sunat status -> internal status; anything else is still 'processing'
+    SUNAT_STATUS_MAP = MappingProxyType({
+        'ACEPTADO': 'accepted',
+        'RECHAZADO': 'rejected',
+        'EXCEPCION': 'exception',
+    })
+    
     # Primary key
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     document_type = models.CharField(
@@ -292,7 +300,24 @@ class Document(models.Model):
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
-    
+
+    class Meta:
+        indexes = [
+            # List endpoint: document_type + created_at range, newest first
+            models.Index(fields=['document_type', '-created_at'], name='doc_type_created_idx'),
+            # Cursor pagination seeks on created_at alone
+            models.Index(fields=['-created_at'], name='doc_created_idx'),
+            # Document lists: NULL sunat_issue_time first, then newest issue time, then newest created
+            # (a DESC column already sorts NULLs first on PostgreSQL, matching the view's NULLS FIRST)
+            models.Index(fields=['-sunat_issue_time', '-created_at'], name='doc_sort_idx'),
+            # total_amount: SUM(amount) over a created_at range only reads rows that have an amount
+            models.Index(
+                fields=['created_at'],
+                name='doc_nonnull_amt_idx',
+                condition=models.Q(amount__isnull=False),
+            ),
+        ]
+
     @classmethod
     def _extract_serie_numero_from_filename(cls, filename: str):
         """
@@ -349,10 +374,44 @@ class Document(models.Model):
             if extracted_numero:
                 numero = extracted_numero
         
-        # Try to get existing document by sunat_id
-        document, created = cls.objects.get_or_create(
+        # Fields derived from the Sunat status and the processed XML, set on create and update alike
+        derived = {
+            'status': cls.SUNAT_STATUS_MAP.get(sunat_data.get('status', '').upper(), 'processing'),
+        }
+        if processed_data and processed_data.get('amount'):
+            from decimal import Decimal
+            derived['amount'] = Decimal(str(processed_data['amount']))
+        
+        # Existing documents only take the values Sunat actually sent
+        updates = {}
+        if sunat_data.get('type'):
+            updates['document_type'] = sunat_data.get('type')
+        if serie:
+            updates['serie'] = serie
+        if numero:
+            updates['numero'] = numero
+        if sunat_data.get('status'):
+            updates['sunat_status'] = sunat_data.get('status')
+        if sunat_data.get('xml'):
+            updates['xml_url'] = sunat_data.get('xml')
+        if sunat_data.get('cdr'):
+            updates['cdr_url'] = sunat_data.get('cdr')
+        if sunat_data.get('issueTime'):
+            updates['sunat_issue_time'] = sunat_data.get('issueTime')
+        if sunat_data.get('responseTime'):
+            updates['sunat_response_time'] = sunat_data.get('responseTime')
+        if 'production' in sunat_data:
+            updates['production'] = sunat_data.get('production')
+        if 'isPurchase' in sunat_data:
+            updates['is_purchase'] = sunat_data.get('isPurchase')
+        if 'faults' in sunat_data:
+            updates['faults'] = sunat_data.get('faults')
+        
+        # One locked SELECT plus a single INSERT or UPDATE, atomically
+        document, _ = cls.objects.update_or_create(
             sunat_id=sunat_id,
-            defaults={
+            defaults={**updates, **derived},
+            create_defaults={
                 'document_type': sunat_data.get('type', ''),
                 'serie': serie,
                 'numero': numero,
@@ -364,52 +423,9 @@ class Document(models.Model):
                 'production': sunat_data.get('production', False),
                 'is_purchase': sunat_data.get('isPurchase', False),
                 'faults': sunat_data.get('faults'),
-            }
+                **derived,
+            },
         )
-        
-        # Update fields if document already exists
-        if not created:
-            # Only update if we have new values
-            if sunat_data.get('type'):
-                document.document_type = sunat_data.get('type')
-            if serie:
-                document.serie = serie
-            if numero:
-                document.numero = numero
-            if sunat_data.get('status'):
-                document.sunat_status = sunat_data.get('status')
-            if sunat_data.get('xml'):
-                document.xml_url = sunat_data.get('xml')
-            if sunat_data.get('cdr'):
-                document.cdr_url = sunat_data.get('cdr')
-            if sunat_data.get('issueTime'):
-                document.sunat_issue_time = sunat_data.get('issueTime')
-            if sunat_data.get('responseTime'):
-                document.sunat_response_time = sunat_data.get('responseTime')
-            if 'production' in sunat_data:
-                document.production = sunat_data.get('production')
-            if 'isPurchase' in sunat_data:
-                document.is_purchase = sunat_data.get('isPurchase')
-            if 'faults' in sunat_data:
-                document.faults = sunat_data.get('faults')
-        
-        # Update status based on sunat_status
-        sunat_status = sunat_data.get('status', '').upper()
-        if sunat_status == 'ACEPTADO':
-            document.status = 'accepted'
-        elif sunat_status == 'RECHAZADO':
-            document.status = 'rejected'
-        elif sunat_status == 'EXCEPCION':
-            document.status = 'exception'
-        else:
-            document.status = 'processing'
-        
-        # Update amount from processed data if available
-        if processed_data and processed_data.get('amount'):
-            from decimal import Decimal
-            document.amount = Decimal(str(processed_data['amount']))
-        
-        document.save()
         return document
     
     def __str__(self):
@@ -1,4 +1,4 @@
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.pagination import CursorPagination, PageNumberPagination
 
 """
 Pagination for the Taxes app.
@@ -16,3 +16,15 @@ class SimplePagination(PageNumberPagination):
     page_query_param = 'page'
     page_size_query_param = 'page_size'
     max_page_size = 100
+
+
+class DocumentCursorPagination(CursorPagination):
+    """
+    Cursor pagination for the document list (?pagination=cursor).
+    Pages seek on created_at (created_at < cursor) instead of using OFFSET,
+    so a deep page costs the same as the first one.
+    """
+    page_size = 25
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = '-created_at'
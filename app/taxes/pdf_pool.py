@@ -0,0 +1,50 @@
+"""
+Process pool for ticket PDF generation
+reportlab rendering is CPU-bound pure Python, so concurrent requests are
+serialized by the GIL. With settings.TICKET_PDF_WORKERS > 0 the PDF is
+rendered in worker processes instead of the request process.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from threading import Lock
+from typing import Optional
+
+from django.conf import settings
+
+from .pdf_utils import generate_ticket_pdf
+
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = Lock()
+
+
+def generate_ticket_pdf_bytes(**kwargs) -> bytes:
+    """
+    Worker entry point: render a ticket and return the raw PDF bytes
+    (a BytesIO cannot be sent back across the process boundary)
+    """
+    return generate_ticket_pdf(**kwargs).getvalue()
+
+
+def get_pdf_executor() -> Optional[ProcessPoolExecutor]:
+    """
+    Return the shared process pool, creating it on first use
+    Returns None when TICKET_PDF_WORKERS is 0 (render inline)
+    """
+    global _executor
+    workers = getattr(settings, 'TICKET_PDF_WORKERS', 0)
+    if not workers:
+        return None
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ProcessPoolExecutor(max_workers=workers)
+    return _executor
+
+
+def shutdown_pdf_executor():
+    """Stop the worker processes (the pool is recreated on next use)"""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
@@ -0,0 +1,53 @@
+"""
+Renderers for the Taxes app.
+Document lists and sync summaries are serialized with orjson instead of the
+stdlib json encoder DRF's JSONRenderer uses.
+"""
+import datetime
+import decimal
+
+import orjson
+from django.db.models.query import QuerySet
+from django.utils.functional import Promise
+from rest_framework.renderers import JSONRenderer
+
+
+def _orjson_default(obj):
+    """
+    Types orjson does not serialize natively, converted the way DRF's JSONEncoder does
+    """
+    if isinstance(obj, Promise):
+        return str(obj)
+    if isinstance(obj, decimal.Decimal):
+        # Serializer DecimalFields are already strings; bare Decimals become floats, as in DRF
+        return float(obj)
+    if isinstance(obj, datetime.timedelta):
+        return str(obj.total_seconds())
+    if isinstance(obj, QuerySet):
+        return tuple(obj)
+    if isinstance(obj, bytes):
+        return obj.decode()
+    if hasattr(obj, '__getitem__'):
+        try:
+            return dict(obj)
+        except (TypeError, ValueError):
+            pass
+    if hasattr(obj, '__iter__'):
+        return tuple(obj)
+    raise TypeError(f'Type is not JSON serializable: {type(obj).__name__}')
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer that encodes with orjson (UTF-8 bytes straight from the C encoder)
+    Indented output (?indent / Accept: ...; indent=N) is left to JSONRenderer
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        renderer_context = renderer_context or {}
+        if self.get_indent(accepted_media_type, renderer_context):
+            return super().render(data, accepted_media_type, renderer_context)
+        # OPT_NON_STR_KEYS: DRF keys ListField child errors by int index; JSONRenderer writes them as strings
+        return orjson.dumps(data, default=_orjson_default, option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS)
@@ -1,3 +1,4 @@
+import copy
 from rest_framework import serializers
 from .models import Document
 from django.core.exceptions import ValidationError
@@ -26,11 +27,33 @@ class CreateTicketSerializer(serializers.Serializer):
     order_id = serializers.IntegerField(required=False, allow_null=True)
 
 
+class SyncBatchSerializer(serializers.Serializer):
+    """Serializer for syncing several documents by sunat_id in one request"""
+    sunat_ids = serializers.ListField(
+        child=serializers.CharField(max_length=100),
+        allow_empty=False,
+        max_length=100,
+    )
+
+
 class DocumentSerializer(serializers.ModelSerializer):
     class Meta:
         model = Document
         fields = '__all__'
 
+    # Unbound fields built from the model on first use, shared by every instance
+    _field_prototype = None
+
+    def get_fields(self):
+        """
+        Introspect the model once per class and give each serializer a copy
+        (ModelSerializer would otherwise rebuild every field on each request)
+        """
+        cls = type(self)
+        if cls.__dict__.get('_field_prototype') is None:
+            cls._field_prototype = super().get_fields()
+        return copy.deepcopy(cls._field_prototype)
+
 
 class GeneratePDFSerializer(serializers.Serializer):
     """
@@ -2,12 +2,23 @@
 Service module for Sunat document processing
 Handles XML downloading, unzipping, and parsing
 """
+import logging
 import requests
 import zipfile
 import io
 from typing import Dict, Optional, Tuple, List
 from defusedxml import ElementTree as ET
 from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+
+logger = logging.getLogger(__name__)
+
+
+# Keep-alive pool for the XML/CDR downloads, sized for the concurrent XML
+# processing in sync_utils; a sync fetches many files from the same CDN host
+_XML_SESSION = requests.Session()
+_XML_SESSION.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=8))
 
 
 def download_and_extract_xml(xml_url: str) -> Tuple[Optional[str], Optional[str]]:
@@ -24,7 +35,7 @@ def download_and_extract_xml(xml_url: str) -> Tuple[Optional[str], Optional[str]
     """
     try:
         # Download the zip file
-        response = requests.get(xml_url, timeout=30)
+        response = _XML_SESSION.get(xml_url, timeout=30)
         response.raise_for_status()
         
         # Check if response is actually a zip file
@@ -124,7 +135,7 @@ def parse_xml_serie_numero(xml_content: str) -> Tuple[Optional[str], Optional[st
         return None, None
         
     except Exception as e:
-        print(f"Error parsing XML for serie/numero: {str(e)}")
+        logger.warning("Error parsing XML for serie/numero: %s", e)
         return None, None
 
 
@@ -174,7 +185,7 @@ def parse_xml_amount(xml_content: str) -> Optional[float]:
         return None
         
     except Exception as e:
-        print(f"Error parsing XML for amount: {str(e)}")
+        logger.warning("Error parsing XML for amount: %s", e)
         return None
 
 
@@ -280,7 +291,7 @@ def parse_xml_invoice_lines(xml_content: str) -> List[Dict]:
         return items
         
     except Exception as e:
-        print(f"Error parsing XML for invoice lines: {str(e)}")
+        logger.warning("Error parsing XML for invoice lines: %s", e)
         return []
 
 
@@ -332,6 +343,6 @@ def parse_xml_customer_info(xml_content: str) -> Dict[str, Optional[str]]:
         return result
         
     except Exception as e:
-        print(f"Error parsing XML for customer info: {str(e)}")
+        logger.warning("Error parsing XML for customer info: %s", e)
         return result
 
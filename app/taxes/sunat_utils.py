@@ -2,10 +2,47 @@
 Utilities for generating Sunat documents (invoices and tickets)
 Handles correlative numbers, number to words conversion, and document body generation
 """
+import logging
+import re
 import requests
 from datetime import datetime
 from typing import Dict, Optional, List, Literal
 from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+logger = logging.getLogger(__name__)
+
+
+# One keep-alive session for every Sunat API call (the views and lastDocument
+# alike), so repeated calls reuse the pooled TLS connections instead of opening
+# a new one per request.
+# Retry only covers idempotent methods (GET); documents are never POSTed twice,
+# and the last 502/503/504 response is still returned to raise_for_status().
+SUNAT_SESSION = requests.Session()
+SUNAT_SESSION.mount('https://', HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=50,
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[502, 503, 504], raise_on_status=False),
+))
+
+
+# Sunat fileName: "<ruc>-<doc type>-<serie>-<numero>", e.g. 20482674828-01-F001-00000001
+# Compiled once; matches the same names the old fileName.split('-') parsing accepted
+# (at least four dash-separated parts, the first four used).
+FILENAME_RE = re.compile(r'(?P<ruc>[^-]*)-(?P<doc_type>[^-]*)-(?P<serie>[^-]*)-(?P<numero>[^-]*)')
+
+
+def parse_file_name(file_name: Optional[str]) -> Optional[Dict[str, str]]:
+    """
+    Split a Sunat fileName into its ruc, doc_type, serie and numero parts
+    
+    Returns:
+        Dict with those four keys, or None if fileName is missing or malformed
+    """
+    match = FILENAME_RE.match(file_name or '')
+    return match.groupdict() if match else None
 
 
 def number_to_words(amount: float) -> str:
@@ -106,7 +143,7 @@ def get_correlative(document_type: Literal['I', 'T']) -> Optional[str]:
     }
     
     try:
-        response = requests.post(
+        response = SUNAT_SESSION.post(
             'https://back.apisunat.com/personas/lastDocument/',
             json=data,
             headers={'Content-Type': 'application/json'},
@@ -116,7 +153,7 @@ def get_correlative(document_type: Literal['I', 'T']) -> Optional[str]:
         result = response.json()
         return result.get('suggestedNumber')
     except Exception as e:
-        print(f"Error getting correlative: {str(e)}")
+        logger.warning("Error getting correlative: %s", e)
         return None
 
 
@@ -1,19 +1,58 @@
 """
 Utility functions for syncing documents from Sunat API
 """
-from typing import List, Dict, Tuple
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import List, Dict, Optional, Tuple
+from django.db import transaction
 from django.utils import timezone
 
 from .models import Document
 
 
-def process_and_sync_documents(sunat_documents: List[Dict], process_sunat_document_func) -> Tuple[int, List[Dict]]:
+logger = logging.getLogger(__name__)
+
+
+# XML downloads run in parallel per sync (each is a separate CDN round-trip)
+_XML_PROCESS_WORKERS = 8
+
+
+def _process_concurrently(sunat_documents: List[Dict], process_func) -> List[Tuple[Optional[Dict], Optional[Exception]]]:
     """
-    Process and sync documents to database.
+    Run process_func over every document in a thread pool
+    Returns one (processed_data, exception) pair per document, in input order
+    """
+    def run(sunat_doc):
+        try:
+            return process_func(sunat_doc), None
+        except Exception as e:
+            return None, e
+
+    if len(sunat_documents) < 2:
+        return [run(sunat_doc) for sunat_doc in sunat_documents]
+    with ThreadPoolExecutor(max_workers=min(_XML_PROCESS_WORKERS, len(sunat_documents))) as executor:
+        return list(executor.map(run, sunat_documents))
+
+
+def process_documents(sunat_documents: List[Dict], process_sunat_document_func) -> List[Tuple[Optional[Dict], Optional[Exception]]]:
+    """
+    Download/parse the XML of every document, concurrently: it is network-bound
+    and independent per document. Nothing is written to the database.
+    
+    Returns:
+        One (processed_data, exception) pair per document, in input order
+    """
+    return _process_concurrently(sunat_documents, process_sunat_document_func)
+
+
+def save_processed_documents(sunat_documents: List[Dict], processed: List[Tuple[Optional[Dict], Optional[Exception]]]) -> Tuple[int, List[Dict]]:
+    """
+    Sync already processed documents to database (see process_documents).
     
     Args:
         sunat_documents: List of document dictionaries from Sunat API
-        process_sunat_document_func: Function to process sunat documents (passed in for testability)
+        processed: The process_documents() result for sunat_documents
         
     Returns:
         Tuple of (synced_count, errors_list)
@@ -21,38 +60,70 @@ def process_and_sync_documents(sunat_documents: List[Dict], process_sunat_docume
     synced_count = 0
     errors = []
     
-    # Process each document
-    for sunat_doc in sunat_documents:
-        try:
-            # Process XML to extract amount (this may fail, but we still want to save the document)
-            processed_data = process_sunat_document_func(sunat_doc)
+    # Persist everything in one transaction (one COMMIT per sync instead of one per
+    # document). update_or_create runs in its own savepoint, so a failing document
+    # is rolled back alone and reported in errors.
+    with transaction.atomic():
+        for sunat_doc, (processed_data, process_error) in zip(sunat_documents, processed):
+            try:
+                # Process XML to extract amount (this may fail, but we still want to save the document)
+                if process_error is not None:
+                    raise process_error
+                
+                # Sync to database even if XML processing failed
+                # This way we at least have the basic document info
+                document = Document.sync_from_sunat(sunat_doc, processed_data)
+                
+                if document:
+                    synced_count += 1
+                    logger.info(
+                        "Synced: %s-%s (Type: %s, Amount: %s)",
+                        document.serie, document.numero, document.document_type, document.amount,
+                    )
+                    # Only report error if XML processing failed
+                    if processed_data.get('error'):
+                        errors.append({
+                            'sunat_id': sunat_doc.get('id'),
+                            'xml_url': sunat_doc.get('xml'),
+                            'error': processed_data['error']
+                        })
             
-            # Sync to database even if XML processing failed
-            # This way we at least have the basic document info
-            document = Document.sync_from_sunat(sunat_doc, processed_data)
-            
-            if document:
-                synced_count += 1
-                # Print serie and numero of synced document
-                print(f"✓ Synced: {document.serie}-{document.numero} (Type: {document.document_type}, Amount: {document.amount})")
-                # Only report error if XML processing failed
-                if processed_data.get('error'):
-                    errors.append({
-                        'sunat_id': sunat_doc.get('id'),
-                        'xml_url': sunat_doc.get('xml'),
-                        'error': processed_data['error']
-                    })
-        
-        except Exception as e:
-            errors.append({
-                'sunat_id': sunat_doc.get('id', 'unknown'),
-                'xml_url': sunat_doc.get('xml'),
-                'error': str(e)
-            })
+            except Exception as e:
+                errors.append({
+                    'sunat_id': sunat_doc.get('id', 'unknown'),
+                    'xml_url': sunat_doc.get('xml'),
+                    'error': str(e)
+                })
     
     return synced_count, errors
 
 
+def process_and_sync_documents(sunat_documents: List[Dict], process_sunat_document_func) -> Tuple[int, List[Dict]]:
+    """
+    Process and sync documents to database.
+    
+    Args:
+        sunat_documents: List of document dictionaries from Sunat API
+        process_sunat_document_func: Function to process sunat documents (passed in for testability)
+        
+    Returns:
+        Tuple of (synced_count, errors_list)
+    """
+    # XML first, concurrently; database writes follow on the request thread, in the original order
+    processed = process_documents(sunat_documents, process_sunat_document_func)
+    return save_processed_documents(sunat_documents, processed)
+
+
+def local_today_range() -> Tuple[datetime, datetime]:
+    """
+    Start and end of today in the local time zone, as aware datetimes
+    Filtering on created_at >= start AND created_at < end can use the created_at
+    indexes, unlike created_at__date (a per-row DATE() cast)
+    """
+    start_of_day = timezone.make_aware(datetime.combine(timezone.localdate(), datetime.min.time()))
+    return start_of_day, start_of_day + timedelta(days=1)
+
+
 def filter_today_documents(sunat_documents: List[Dict]) -> List[Dict]:
     """
     Filter documents to only include those created today in our database.
@@ -67,12 +138,12 @@ def filter_today_documents(sunat_documents: List[Dict]) -> List[Dict]:
     Returns:
         List of documents created today (based on created_at) or new documents
     """
-    now = timezone.now()
+    start_of_day, end_of_day = local_today_range()
     
     # Get all existing document IDs from our database (created today based on created_at)
     existing_today_doc_ids = set(
         Document.objects.filter(
-            created_at__date=now.date()
+            created_at__gte=start_of_day, created_at__lt=end_of_day
         ).values_list('sunat_id', flat=True)
     )
     
@@ -3,7 +3,9 @@ from decimal import Decimal
 from datetime import datetime, timedelta
 from model_bakery import baker
 from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
 from django.conf import settings
+from django.core.cache import cache
 
 from taxes.models import Document
 from core.models import User
@@ -16,6 +18,14 @@ def pytest_configure():
         settings.INSTALLED_APPS.remove('debug_toolbar')
     if 'debug_toolbar.middleware.DebugToolbarMiddleware' in settings.MIDDLEWARE:
         settings.MIDDLEWARE.remove('debug_toolbar.middleware.DebugToolbarMiddleware')
+    # Any user created with a password should not pay for PBKDF2 in tests
+    settings.PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    """Start every test with an empty cache (cached Sunat payloads must not leak between tests)"""
+    cache.clear()
 
 
 @pytest.fixture
@@ -30,11 +40,45 @@ def user():
     return baker.make(User, username='testuser', email='test@example.com')
 
 
+@pytest.fixture(scope='session')
+def api_user(django_db_setup, django_db_blocker):
+    """Test user shared by the whole test session (created outside the per-test transaction)"""
+    with django_db_blocker.unblock():
+        # get_or_create: a run killed before teardown leaves the row in the --reuse-db database
+        api_user, _ = User.objects.get_or_create(username='apiuser', defaults={'email': 'api@example.com'})
+    yield api_user
+    with django_db_blocker.unblock():
+        api_user.delete()
+
+
+@pytest.fixture(scope='session')
+def authenticated_api_client(api_user):
+    """API client authenticated with the session test user, reused by every test"""
+    client = APIClient()
+    client.force_authenticate(user=api_user)
+    return client
+
+
+@pytest.fixture(scope='session')
+def api_access_token(api_user):
+    """JWT access token for the session test user, minted once per session"""
+    return str(RefreshToken.for_user(api_user).access_token)
+
+
+@pytest.fixture
+def jwt_api_client(api_access_token):
+    """API client that authenticates through the real JWT header instead of force_authenticate"""
+    header_type = settings.SIMPLE_JWT['AUTH_HEADER_TYPES'][0]
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'{header_type} {api_access_token}')
+    return client
+
+
 @pytest.fixture
-def authenticated_api_client(user):
-    """API client authenticated with a test user"""
+def fresh_api_client(api_user):
+    """Per-test authenticated API client for tests that change client state (credentials, cookies)"""
     client = APIClient()
-    client.force_authenticate(user=user)
+    client.force_authenticate(user=api_user)
     return client
 
 
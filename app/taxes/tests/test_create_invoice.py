@@ -1,4 +1,5 @@
 import pytest
+import requests
 from decimal import Decimal
 from datetime import datetime
 from unittest.mock import patch, Mock, MagicMock
@@ -77,7 +78,7 @@ class TestDocumentCreateInvoiceView:
         assert 'error' in response.data
         assert 'correlative' in response.data['error'].lower()
     
-    @patch('taxes.views.requests.post')
+    @patch('taxes.views._SUNAT_SESSION.post')
     @patch('taxes.views.get_correlative')
     def test_create_invoice_sunat_api_error(self, mock_get_correlative, mock_post, authenticated_api_client):
         """Test invoice creation when Sunat API returns an error"""
@@ -106,7 +107,7 @@ class TestDocumentCreateInvoiceView:
         assert 'error' in response.data
         assert 'Failed to create invoice' in response.data['error']
     
-    @patch('taxes.views.requests.post')
+    @patch('taxes.views._SUNAT_SESSION.post')
     @patch('taxes.views.get_correlative')
     def test_create_invoice_sunat_error_status(self, mock_get_correlative, mock_post, authenticated_api_client):
         """Test invoice creation when Sunat API returns error status"""
@@ -140,8 +141,8 @@ class TestDocumentCreateInvoiceView:
     
     @patch('taxes.views.time.sleep')
     @patch('taxes.views.process_and_sync_documents')
-    @patch('taxes.views.requests.get')
-    @patch('taxes.views.requests.post')
+    @patch('taxes.views._SUNAT_SESSION.get')
+    @patch('taxes.views._SUNAT_SESSION.post')
     @patch('taxes.views.get_correlative')
     def test_create_invoice_success_without_order_id(self, mock_get_correlative, mock_post, mock_get, mock_sync, mock_sleep, authenticated_api_client):
         """Test successful invoice creation without order_id and sync succeeds with ACEPTADO"""
@@ -205,8 +206,8 @@ class TestDocumentCreateInvoiceView:
     
     @patch('taxes.views.time.sleep')
     @patch('taxes.views.process_and_sync_documents')
-    @patch('taxes.views.requests.get')
-    @patch('taxes.views.requests.post')
+    @patch('taxes.views._SUNAT_SESSION.get')
+    @patch('taxes.views._SUNAT_SESSION.post')
     @patch('taxes.views.get_correlative')
     def test_create_invoice_success_with_order_id(self, mock_get_correlative, mock_post, mock_get, mock_sync, mock_sleep, authenticated_api_client):
         """Test successful invoice creation with order_id and sync succeeds"""
@@ -262,13 +263,13 @@ class TestDocumentCreateInvoiceView:
         assert document.amount == Decimal('120.00')
         
         # Verify order was updated with document
-        order.refresh_from_db()
+        order.refresh_from_db(fields=['document'])
         assert order.document == document
     
     @patch('taxes.views.time.sleep')
     @patch('taxes.views.process_and_sync_documents')
-    @patch('taxes.views.requests.get')
-    @patch('taxes.views.requests.post')
+    @patch('taxes.views._SUNAT_SESSION.get')
+    @patch('taxes.views._SUNAT_SESSION.post')
     @patch('taxes.views.get_correlative')
     def test_create_invoice_order_not_found(self, mock_get_correlative, mock_post, mock_get, mock_sync, mock_sleep, authenticated_api_client):
         """Test invoice creation when order_id is provided but order doesn't exist"""
@@ -316,13 +317,12 @@ class TestDocumentCreateInvoiceView:
         # Verify document was created
         assert models.Document.objects.filter(sunat_id='test-document-id-789').exists()
     
-    @patch('taxes.views.requests.post')
+    @patch('taxes.views._SUNAT_SESSION.post')
     @patch('taxes.views.get_correlative')
     def test_create_invoice_network_error(self, mock_get_correlative, mock_post, authenticated_api_client):
         """Test invoice creation when network error occurs"""
         mock_get_correlative.return_value = '00000004'
         
-        import requests
         mock_post.side_effect = requests.exceptions.RequestException("Connection error")
         
         url = reverse('document-create-invoice')
@@ -345,8 +345,8 @@ class TestDocumentCreateInvoiceView:
     
     @patch('taxes.views.time.sleep')
     @patch('taxes.views.process_and_sync_documents')
-    @patch('taxes.views.requests.get')
-    @patch('taxes.views.requests.post')
+    @patch('taxes.views._SUNAT_SESSION.get')
+    @patch('taxes.views._SUNAT_SESSION.post')
     @patch('taxes.views.get_correlative')
     def test_create_invoice_multiple_items(self, mock_get_correlative, mock_post, mock_get, mock_sync, mock_sleep, authenticated_api_client):
         """Test invoice creation with multiple order items"""
@@ -396,8 +396,8 @@ class TestDocumentCreateInvoiceView:
     
     @patch('taxes.views.time.sleep')
     @patch('taxes.views.process_and_sync_documents')
-    @patch('taxes.views.requests.get')
-    @patch('taxes.views.requests.post')
+    @patch('taxes.views._SUNAT_SESSION.get')
+    @patch('taxes.views._SUNAT_SESSION.post')
     @patch('taxes.views.get_correlative')
     def test_create_invoice_verifies_sunat_api_call(self, mock_get_correlative, mock_post, mock_get, mock_sync, mock_sleep, authenticated_api_client):
         """Test that the correct data is sent to Sunat API"""
@@ -452,8 +452,8 @@ class TestDocumentCreateInvoiceView:
     
     @patch('taxes.views.time.sleep')
     @patch('taxes.views.process_and_sync_documents')
-    @patch('taxes.views.requests.get')
-    @patch('taxes.views.requests.post')
+    @patch('taxes.views._SUNAT_SESSION.get')
+    @patch('taxes.views._SUNAT_SESSION.post')
     @patch('taxes.views.get_correlative')
     def test_create_invoice_sync_retries_until_aceptado(self, mock_get_correlative, mock_post, mock_get, mock_sync, mock_sleep, authenticated_api_client):
         """Test that sync retries until status is ACEPTADO"""
@@ -512,11 +512,52 @@ class TestDocumentCreateInvoiceView:
         
         # Verify sleep was called between retries
         mock_sleep.assert_called()
+        # Only one retry was needed, after the shortest backoff step
+        mock_sleep.assert_called_once_with(0.5)
     
     @patch('taxes.views.time.sleep')
     @patch('taxes.views.process_and_sync_documents')
-    @patch('taxes.views.requests.get')
-    @patch('taxes.views.requests.post')
+    @patch('taxes.views._SUNAT_SESSION.get')
+    @patch('taxes.views._SUNAT_SESSION.post')
+    @patch('taxes.views.get_correlative')
+    def test_create_invoice_sync_rereads_document_once(self, mock_get_correlative, mock_post, mock_get, mock_sync, mock_sleep, authenticated_api_client):
+        """Test that pending polls don't re-read the document; it is refreshed once the status settles"""
+        mock_get_correlative.return_value = '00000008'
+        mock_post.return_value = Mock(status_code=200, json=lambda: {'documentId': 'test-invoice-reread', 'status': 'OK'})
+        
+        def get_by_id(sunat_status):
+            return Mock(status_code=200, json=lambda: {
+                'id': 'test-invoice-reread',
+                'type': '01',
+                'status': sunat_status,
+                'fileName': '20482674828-01-F001-00000008',
+            })
+        
+        mock_get.side_effect = [get_by_id('PENDIENTE')] * 3 + [get_by_id('ACEPTADO')]
+        mock_sync.return_value = (1, [])
+        
+        with patch.object(models.Document, 'refresh_from_db', autospec=True) as mock_refresh:
+            response = authenticated_api_client.post(
+                reverse('document-create-invoice'),
+                {
+                    'order_items': [
+                        {'id': '1', 'name': 'Producto 1', 'quantity': 1, 'cost': 50.00}
+                    ],
+                    'ruc': '20123456789',
+                    'razon_social': 'Empresa S.A.C.',
+                    'address': 'Av. Principal 123'
+                },
+                format='json'
+            )
+        
+        assert response.status_code == status.HTTP_201_CREATED
+        assert mock_get.call_count == 4
+        mock_refresh.assert_called_once()
+    
+    @patch('taxes.views.time.sleep')
+    @patch('taxes.views.process_and_sync_documents')
+    @patch('taxes.views._SUNAT_SESSION.get')
+    @patch('taxes.views._SUNAT_SESSION.post')
     @patch('taxes.views.get_correlative')
     def test_create_invoice_sync_stops_on_rechazado(self, mock_get_correlative, mock_post, mock_get, mock_sync, mock_sleep, authenticated_api_client):
         """Test that sync stops when status is RECHAZADO"""
@@ -570,8 +611,8 @@ class TestDocumentCreateInvoiceView:
     
     @patch('taxes.views.time.sleep')
     @patch('taxes.views.process_and_sync_documents')
-    @patch('taxes.views.requests.get')
-    @patch('taxes.views.requests.post')
+    @patch('taxes.views._SUNAT_SESSION.get')
+    @patch('taxes.views._SUNAT_SESSION.post')
     @patch('taxes.views.get_correlative')
     def test_create_invoice_sync_handles_404(self, mock_get_correlative, mock_post, mock_get, mock_sync, mock_sleep, authenticated_api_client):
         """Test that sync handles 404 (document not found yet) and retries"""
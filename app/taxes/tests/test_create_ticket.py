@@ -1,4 +1,5 @@
 import pytest
+import requests
 from decimal import Decimal
 from datetime import datetime
 from unittest.mock import patch, Mock, MagicMock
@@ -71,7 +72,7 @@ class TestDocumentCreateTicketView:
         assert 'error' in response.data
         assert 'correlative' in response.data['error'].lower()
     
-    @patch('taxes.views.requests.post')
+    @patch('taxes.views._SUNAT_SESSION.post')
     @patch('taxes.views.get_correlative')
     def test_create_ticket_sunat_api_error(self, mock_get_correlative, mock_post, authenticated_api_client):
         """Test ticket creation when Sunat API returns an error"""
@@ -97,7 +98,7 @@ class TestDocumentCreateTicketView:
         assert 'error' in response.data
         assert 'Failed to create ticket' in response.data['error']
     
-    @patch('taxes.views.requests.post')
+    @patch('taxes.views._SUNAT_SESSION.post')
     @patch('taxes.views.get_correlative')
     def test_create_ticket_sunat_error_status(self, mock_get_correlative, mock_post, authenticated_api_client):
         """Test ticket creation when Sunat API returns error status"""
@@ -128,8 +129,8 @@ class TestDocumentCreateTicketView:
     
     @patch('taxes.views.time.sleep')
     @patch('taxes.views.process_and_sync_documents')
-    @patch('taxes.views.requests.get')
-    @patch('taxes.views.requests.post')
+    @patch('taxes.views._SUNAT_SESSION.get')
+    @patch('taxes.views._SUNAT_SESSION.post')
     @patch('taxes.views.get_correlative')
     def test_create_ticket_success_without_order_id(self, mock_get_correlative, mock_post, mock_get, mock_sync, mock_sleep, authenticated_api_client):
         """Test successful ticket creation without order_id and sync succeeds with ACEPTADO"""
@@ -190,8 +191,8 @@ class TestDocumentCreateTicketView:
     
     @patch('taxes.views.time.sleep')
     @patch('taxes.views.process_and_sync_documents')
-    @patch('taxes.views.requests.get')
-    @patch('taxes.views.requests.post')
+    @patch('taxes.views._SUNAT_SESSION.get')
+    @patch('taxes.views._SUNAT_SESSION.post')
     @patch('taxes.views.get_correlative')
     def test_create_ticket_success_with_order_id(self, mock_get_correlative, mock_post, mock_get, mock_sync, mock_sleep, authenticated_api_client):
         """Test successful ticket creation with order_id and sync succeeds"""
@@ -244,13 +245,13 @@ class TestDocumentCreateTicketView:
         assert document.amount == Decimal('120.00')
         
         # Verify order was updated with document
-        order.refresh_from_db()
+        order.refresh_from_db(fields=['document'])
         assert order.document == document
     
     @patch('taxes.views.time.sleep')
     @patch('taxes.views.process_and_sync_documents')
-    @patch('taxes.views.requests.get')
-    @patch('taxes.views.requests.post')
+    @patch('taxes.views._SUNAT_SESSION.get')
+    @patch('taxes.views._SUNAT_SESSION.post')
     @patch('taxes.views.get_correlative')
     def test_create_ticket_order_not_found(self, mock_get_correlative, mock_post, mock_get, mock_sync, mock_sleep, authenticated_api_client):
         """Test ticket creation when order_id is provided but order doesn't exist"""
@@ -295,13 +296,12 @@ class TestDocumentCreateTicketView:
         # Verify document was created
         assert models.Document.objects.filter(sunat_id='test-ticket-id-789').exists()
     
-    @patch('taxes.views.requests.post')
+    @patch('taxes.views._SUNAT_SESSION.post')
     @patch('taxes.views.get_correlative')
     def test_create_ticket_network_error(self, mock_get_correlative, mock_post, authenticated_api_client):
         """Test ticket creation when network error occurs"""
         mock_get_correlative.return_value = '00000004'
         
-        import requests
         mock_post.side_effect = requests.exceptions.RequestException("Connection error")
         
         url = reverse('document-create-ticket')
@@ -321,8 +321,8 @@ class TestDocumentCreateTicketView:
     
     @patch('taxes.views.time.sleep')
     @patch('taxes.views.process_and_sync_documents')
-    @patch('taxes.views.requests.get')
-    @patch('taxes.views.requests.post')
+    @patch('taxes.views._SUNAT_SESSION.get')
+    @patch('taxes.views._SUNAT_SESSION.post')
     @patch('taxes.views.get_correlative')
     def test_create_ticket_multiple_items(self, mock_get_correlative, mock_post, mock_get, mock_sync, mock_sleep, authenticated_api_client):
         """Test ticket creation with multiple order items"""
@@ -369,8 +369,8 @@ class TestDocumentCreateTicketView:
     
     @patch('taxes.views.time.sleep')
     @patch('taxes.views.process_and_sync_documents')
-    @patch('taxes.views.requests.get')
-    @patch('taxes.views.requests.post')
+    @patch('taxes.views._SUNAT_SESSION.get')
+    @patch('taxes.views._SUNAT_SESSION.post')
     @patch('taxes.views.get_correlative')
     def test_create_ticket_verifies_sunat_api_call(self, mock_get_correlative, mock_post, mock_get, mock_sync, mock_sleep, authenticated_api_client):
         """Test that the correct data is sent to Sunat API"""
@@ -422,8 +422,8 @@ class TestDocumentCreateTicketView:
     
     @patch('taxes.views.time.sleep')
     @patch('taxes.views.process_and_sync_documents')
-    @patch('taxes.views.requests.get')
-    @patch('taxes.views.requests.post')
+    @patch('taxes.views._SUNAT_SESSION.get')
+    @patch('taxes.views._SUNAT_SESSION.post')
     @patch('taxes.views.get_correlative')
     def test_create_ticket_uses_ticket_type(self, mock_get_correlative, mock_post, mock_get, mock_sync, mock_sleep, authenticated_api_client):
         """Test that get_correlative is called with 'T' for ticket"""
@@ -467,8 +467,8 @@ class TestDocumentCreateTicketView:
     
     @patch('taxes.views.time.sleep')
     @patch('taxes.views.process_and_sync_documents')
-    @patch('taxes.views.requests.get')
-    @patch('taxes.views.requests.post')
+    @patch('taxes.views._SUNAT_SESSION.get')
+    @patch('taxes.views._SUNAT_SESSION.post')
     @patch('taxes.views.get_correlative')
     def test_create_ticket_sync_retries_until_aceptado(self, mock_get_correlative, mock_post, mock_get, mock_sync, mock_sleep, authenticated_api_client):
         """Test that sync retries until status is ACEPTADO"""
@@ -527,8 +527,8 @@ class TestDocumentCreateTicketView:
     
     @patch('taxes.views.time.sleep')
     @patch('taxes.views.process_and_sync_documents')
-    @patch('taxes.views.requests.get')
-    @patch('taxes.views.requests.post')
+    @patch('taxes.views._SUNAT_SESSION.get')
+    @patch('taxes.views._SUNAT_SESSION.post')
     @patch('taxes.views.get_correlative')
     def test_create_ticket_sync_stops_on_rechazado(self, mock_get_correlative, mock_post, mock_get, mock_sync, mock_sleep, authenticated_api_client):
         """Test that sync stops when status is RECHAZADO"""
@@ -579,8 +579,8 @@ class TestDocumentCreateTicketView:
     
     @patch('taxes.views.time.sleep')
     @patch('taxes.views.process_and_sync_documents')
-    @patch('taxes.views.requests.get')
-    @patch('taxes.views.requests.post')
+    @patch('taxes.views._SUNAT_SESSION.get')
+    @patch('taxes.views._SUNAT_SESSION.post')
     @patch('taxes.views.get_correlative')
     def test_create_ticket_sync_handles_404(self, mock_get_correlative, mock_post, mock_get, mock_sync, mock_sleep, authenticated_api_client):
         """Test that sync handles 404 (document not found yet) and retries"""
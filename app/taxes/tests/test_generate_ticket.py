@@ -1,210 +1,194 @@
 import pytest
+import uuid
 from decimal import Decimal
-from unittest.mock import patch, Mock, MagicMock
+from io import BytesIO
+from unittest.mock import patch, Mock
 from model_bakery import baker
 from rest_framework import status
+from rest_framework.test import APIRequestFactory, force_authenticate
+from django.db import transaction
 from django.urls import reverse
-from datetime import datetime
 
-from taxes import models
+from taxes import models, pdf_pool, pdf_utils
+from taxes.views import DocumentViewSet
 from store import models as store_models
 
 
-@pytest.mark.django_db
+# Keep the module on one xdist worker under --dist=loadgroup too (class-scoped
+# fixtures and the PDF process pool are then built once, not once per worker)
+pytestmark = pytest.mark.xdist_group('generate_ticket')
+
+# Resolved once at import; the path never changes during a run
+TICKET_URL = reverse('document-generate-ticket')
+
+# generate-ticket view called directly (no URL resolver / middleware) for validation-only tests
+_generate_ticket_view = DocumentViewSet.as_view({'post': 'generate_ticket'})
+_request_factory = APIRequestFactory()
+
+
+def _post_generate_ticket(data, user=None):
+    """POST data straight to the generate_ticket view, authenticated as user if given"""
+    request = _request_factory.post(TICKET_URL, data, format='json')
+    if user is not None:
+        force_authenticate(request, user=user)
+    return _generate_ticket_view(request)
+
+
+# Fixed Sunat issue time (2023-11-14 22:13:20 UTC, epoch ms) for the stored documents
+_SUNAT_ISSUE_TIME_MS = 1_700_000_000_000
+
+# Stand-in for a rendered ticket: valid header/trailer, ~1.2 KB body
+_FAKE_PDF = b'%PDF-1.4\n' + b'x' * 1200 + b'\n%%EOF'
+
+
+@pytest.fixture(autouse=True)
+def _fake_pdf(request, monkeypatch):
+    """Skip ReportLab in the view unless the test is marked real_pdf (tests patching it themselves still win)"""
+    if request.node.get_closest_marker('real_pdf'):
+        return
+    monkeypatch.setattr('taxes.views.generate_ticket_pdf', lambda *args, **kwargs: BytesIO(_FAKE_PDF))
+
+
+def _pdf_bytes(response):
+    """Join the whole body of a streamed PDF response (only for checks that need the full document)"""
+    return b''.join(response.streaming_content)
+
+
+def _assert_pdf_ok(response, filename_prefix='ticket_'):
+    """Assert a 200 inline PDF response whose filename starts with filename_prefix and whose body is complete"""
+    assert response.status_code == status.HTTP_200_OK
+    assert response['Content-Type'] == 'application/pdf'
+    assert 'inline' in response['Content-Disposition']
+    assert f'filename="{filename_prefix}' in response['Content-Disposition']
+    pdf_content = _pdf_bytes(response)
+    assert pdf_content.startswith(b'%PDF')  # PDF file signature
+    assert response['Content-Length'] == str(len(pdf_content))
+
+
+# Order items reused across payloads (never mutated: the client serializes them to JSON)
+_ITEM_2_AT_10 = {'id': '1', 'name': 'Producto 1', 'quantity': 2, 'cost': 10.00}
+_ITEM_1_AT_10 = {'id': '1', 'name': 'Producto 1', 'quantity': 1, 'cost': 10.00}
+_ITEM_1_AT_50 = {'id': '1', 'name': 'Producto 1', 'quantity': 1, 'cost': 50.00}
+
+
+# Ticket payloads (document_type is added by the test) and the filename each one should produce;
+# without an order_number the filename falls back to a timestamp
+TICKET_PAYLOADS = pytest.mark.parametrize('payload,filename_prefix', [
+    pytest.param(
+        {'order_items': [_ITEM_2_AT_10]},
+        'ticket_',
+        id='basic',
+    ),
+    pytest.param(
+        {
+            'order_items': [
+                _ITEM_2_AT_10,
+                {'id': '2', 'name': 'Producto 2', 'quantity': 1, 'cost': 25.50},
+            ],
+            'order_number': 'ORD-001',
+            'customer_name': 'Juan Pérez',
+        },
+        'ticket_ORD-001.pdf',
+        id='all_fields',
+    ),
+    pytest.param(
+        {
+            'order_items': [
+                {'id': '1', 'name': 'Producto 1', 'quantity': 2, 'cost': 60.00},
+                {'id': '2', 'name': 'Producto 2', 'quantity': 1, 'cost': 30.00},
+                {'id': '3', 'name': 'Producto 3', 'quantity': 3, 'cost': 15.50},
+            ],
+        },
+        'ticket_',
+        id='multiple_items',
+    ),
+    # Should still generate PDF (just empty items)
+    pytest.param({'order_items': []}, 'ticket_', id='empty_order_items'),
+    pytest.param(
+        {'order_items': [_ITEM_1_AT_50], 'order_number': 'ORD-123'},
+        'ticket_ORD-123.pdf',
+        id='order_number_only',
+    ),
+    pytest.param(
+        {'order_items': [_ITEM_1_AT_50], 'customer_name': 'Maria Garcia'},
+        'ticket_',
+        id='customer_name_only',
+    ),
+    pytest.param(
+        {
+            'order_items': [_ITEM_1_AT_50],
+            'order_number': '',
+            'customer_name': '',
+        },
+        'ticket_',
+        id='empty_optional_fields',
+    ),
+    pytest.param(
+        {
+            'order_items': [
+                {'id': '1', 'name': 'Producto 1', 'quantity': 1.5, 'cost': 10.99},
+                {'id': '2', 'name': 'Producto 2', 'quantity': 2.25, 'cost': 5.50},
+            ],
+        },
+        'ticket_',
+        id='decimal_precision',
+    ),
+])
+
+
+# Payloads rejected by the serializer, with the field the 400 response reports
+INVALID_PAYLOADS = pytest.mark.parametrize('payload,error_field', [
+    pytest.param({}, 'document_type', id='empty'),
+    pytest.param(
+        {'document_type': 'ticket', 'order_number': 'ORD-001', 'customer_name': 'Test Customer'},
+        'order_items',
+        id='ticket_missing_order_items',
+    ),
+    pytest.param(
+        # Missing quantity and cost
+        {'document_type': 'ticket', 'order_items': [{'id': '1', 'name': 'Producto 1'}]},
+        'order_items',
+        id='ticket_invalid_order_items',
+    ),
+    # Boletas/facturas need a document_id or sunat_id
+    pytest.param({'document_type': 'boleta'}, 'document_id', id='boleta_missing_document_id'),
+])
+
+
 class TestDocumentGenerateTicketView:
-    """Tests for POST /taxes/documents/generate-ticket/ - Generate simple ticket PDF (no Sunat)"""
+    """Tests for POST /taxes/documents/generate-ticket/ - Generate simple ticket PDF (no Sunat)
     
-    def test_generate_ticket_unauthenticated(self, api_client):
+    Simple tickets are rendered from the request payload alone, so this class
+    runs without the django_db mark (the session user is created once, outside
+    any test transaction).
+    """
+    
+    def test_generate_ticket_unauthenticated(self):
         """Test that unauthenticated requests are rejected"""
-        url = reverse('document-generate-ticket')
-        response = api_client.post(url, {})
+        response = _post_generate_ticket({})
         
         assert response.status_code == status.HTTP_401_UNAUTHORIZED
     
-    def test_generate_ticket_invalid_data(self, authenticated_api_client):
-        """Test ticket generation with invalid data"""
-        url = reverse('document-generate-ticket')
-        response = authenticated_api_client.post(url, {}, format='json')
-        
-        assert response.status_code == status.HTTP_400_BAD_REQUEST
-        assert 'document_type' in response.data
-    
-    def test_generate_ticket_missing_order_items(self, authenticated_api_client):
-        """Test ticket generation without order_items"""
-        url = reverse('document-generate-ticket')
-        response = authenticated_api_client.post(
-            url,
-            {
-                'document_type': 'ticket',
-                'order_number': 'ORD-001',
-                'customer_name': 'Test Customer'
-            },
-            format='json'
-        )
-        
-        assert response.status_code == status.HTTP_400_BAD_REQUEST
-        assert 'order_items' in response.data
-    
-    def test_generate_ticket_invalid_order_items(self, authenticated_api_client):
-        """Test ticket generation with invalid order_items format"""
-        url = reverse('document-generate-ticket')
-        response = authenticated_api_client.post(
-            url,
-            {
-                'document_type': 'ticket',
-                'order_items': [
-                    {'id': '1', 'name': 'Producto 1'}  # Missing quantity and cost
-                ]
-            },
-            format='json'
-        )
+    @INVALID_PAYLOADS
+    def test_generate_ticket_invalid_payload(self, api_user, payload, error_field):
+        """Test that payloads failing serializer validation are rejected before any lookup"""
+        response = _post_generate_ticket(payload, user=api_user)
         
         assert response.status_code == status.HTTP_400_BAD_REQUEST
-        assert 'order_items' in response.data
-    
-    def test_generate_ticket_success_basic(self, authenticated_api_client):
-        """Test successful ticket generation with minimal data"""
-        url = reverse('document-generate-ticket')
-        response = authenticated_api_client.post(
-            url,
-            {
-                'document_type': 'ticket',
-                'order_items': [
-                    {'id': '1', 'name': 'Producto 1', 'quantity': 2, 'cost': 10.00}
-                ]
-            },
-            format='json'
-        )
-        
-        assert response.status_code == status.HTTP_200_OK
-        assert response['Content-Type'] == 'application/pdf'
-        assert 'inline' in response['Content-Disposition']
-        assert 'filename="ticket_' in response['Content-Disposition']
-        
-        # Verify PDF content is returned
-        assert len(response.content) > 0
-        assert response.content[:4] == b'%PDF'  # PDF file signature
+        assert error_field in response.data
     
-    def test_generate_ticket_success_with_all_fields(self, authenticated_api_client):
-        """Test successful ticket generation with all optional fields"""
-        url = reverse('document-generate-ticket')
-        response = authenticated_api_client.post(
-            url,
-            {
-                'document_type': 'ticket',
-                'order_items': [
-                    {'id': '1', 'name': 'Producto 1', 'quantity': 2, 'cost': 10.00},
-                    {'id': '2', 'name': 'Producto 2', 'quantity': 1, 'cost': 25.50}
-                ],
-                'order_number': 'ORD-001',
-                'customer_name': 'Juan Pérez'
-            },
-            format='json'
-        )
+    @TICKET_PAYLOADS
+    def test_generate_ticket_success(self, authenticated_api_client, payload, filename_prefix):
+        """Test successful ticket generation for each payload shape"""
+        response = authenticated_api_client.post(TICKET_URL, {'document_type': 'ticket', **payload}, format='json')
         
-        assert response.status_code == status.HTTP_200_OK
-        assert response['Content-Type'] == 'application/pdf'
-        assert 'filename="ticket_ORD-001.pdf"' in response['Content-Disposition']
-        assert response.content[:4] == b'%PDF'
-    
-    def test_generate_ticket_multiple_items(self, authenticated_api_client):
-        """Test ticket generation with multiple order items"""
-        url = reverse('document-generate-ticket')
-        response = authenticated_api_client.post(
-            url,
-            {
-                'document_type': 'ticket',
-                'order_items': [
-                    {'id': '1', 'name': 'Producto 1', 'quantity': 2, 'cost': 60.00},
-                    {'id': '2', 'name': 'Producto 2', 'quantity': 1, 'cost': 30.00},
-                    {'id': '3', 'name': 'Producto 3', 'quantity': 3, 'cost': 15.50}
-                ]
-            },
-            format='json'
-        )
-        
-        assert response.status_code == status.HTTP_200_OK
-        assert response['Content-Type'] == 'application/pdf'
-        assert response.content[:4] == b'%PDF'
-    
-    def test_generate_ticket_empty_order_items(self, authenticated_api_client):
-        """Test ticket generation with empty order_items list"""
-        url = reverse('document-generate-ticket')
-        response = authenticated_api_client.post(
-            url,
-            {
-                'document_type': 'ticket',
-                'order_items': []
-            },
-            format='json'
-        )
-        
-        # Should still generate PDF (just empty items)
-        assert response.status_code == status.HTTP_200_OK
-        assert response['Content-Type'] == 'application/pdf'
-    
-    def test_generate_ticket_with_order_number_only(self, authenticated_api_client):
-        """Test ticket generation with only order_number"""
-        url = reverse('document-generate-ticket')
-        response = authenticated_api_client.post(
-            url,
-            {
-                'document_type': 'ticket',
-                'order_items': [
-                    {'id': '1', 'name': 'Producto 1', 'quantity': 1, 'cost': 50.00}
-                ],
-                'order_number': 'ORD-123'
-            },
-            format='json'
-        )
-        
-        assert response.status_code == status.HTTP_200_OK
-        assert 'filename="ticket_ORD-123.pdf"' in response['Content-Disposition']
-    
-    def test_generate_ticket_with_customer_name_only(self, authenticated_api_client):
-        """Test ticket generation with only customer_name"""
-        url = reverse('document-generate-ticket')
-        response = authenticated_api_client.post(
-            url,
-            {
-                'document_type': 'ticket',
-                'order_items': [
-                    {'id': '1', 'name': 'Producto 1', 'quantity': 1, 'cost': 50.00}
-                ],
-                'customer_name': 'Maria Garcia'
-            },
-            format='json'
-        )
-        
-        assert response.status_code == status.HTTP_200_OK
-        assert response['Content-Type'] == 'application/pdf'
-        # Filename should have timestamp since no order_number
-        assert 'filename="ticket_' in response['Content-Disposition']
-    
-    def test_generate_ticket_empty_optional_fields(self, authenticated_api_client):
-        """Test ticket generation with empty optional fields"""
-        url = reverse('document-generate-ticket')
-        response = authenticated_api_client.post(
-            url,
-            {
-                'document_type': 'ticket',
-                'order_items': [
-                    {'id': '1', 'name': 'Producto 1', 'quantity': 1, 'cost': 50.00}
-                ],
-                'order_number': '',
-                'customer_name': ''
-            },
-            format='json'
-        )
-        
-        assert response.status_code == status.HTTP_200_OK
-        assert response['Content-Type'] == 'application/pdf'
+        _assert_pdf_ok(response, filename_prefix)
     
+    @pytest.mark.real_pdf
     def test_generate_ticket_pdf_content_structure(self, authenticated_api_client):
         """Test that generated PDF has correct structure"""
-        url = reverse('document-generate-ticket')
         response = authenticated_api_client.post(
-            url,
+            TICKET_URL,
             {
                 'document_type': 'ticket',
                 'order_items': [
@@ -217,64 +201,51 @@ class TestDocumentGenerateTicketView:
         )
         
         assert response.status_code == status.HTTP_200_OK
-        pdf_content = response.content
+        pdf_content = _pdf_bytes(response)
         
         # Verify PDF signature
-        assert pdf_content[:4] == b'%PDF'
+        assert pdf_content.startswith(b'%PDF')
         
         # Verify PDF structure (check for PDF end marker)
-        assert b'%%EOF' in pdf_content
+        assert b'%%EOF' in pdf_content[-32:]  # trailer sits at the very end
         
         # Verify PDF is not empty
         assert len(pdf_content) > 1000  # Should be at least 1KB for a valid ticket
     
-    def test_generate_ticket_decimal_precision(self, authenticated_api_client):
-        """Test ticket generation with decimal quantities and costs"""
-        url = reverse('document-generate-ticket')
-        response = authenticated_api_client.post(
-            url,
-            {
-                'document_type': 'ticket',
-                'order_items': [
-                    {'id': '1', 'name': 'Producto 1', 'quantity': 1.5, 'cost': 10.99},
-                    {'id': '2', 'name': 'Producto 2', 'quantity': 2.25, 'cost': 5.50}
-                ]
-            },
-            format='json'
-        )
-        
-        assert response.status_code == status.HTTP_200_OK
-        assert response['Content-Type'] == 'application/pdf'
-    
-    def test_generate_ticket_long_product_name(self, authenticated_api_client):
-        """Test ticket generation with very long product names"""
-        url = reverse('document-generate-ticket')
-        response = authenticated_api_client.post(
-            url,
-            {
-                'document_type': 'ticket',
-                'order_items': [
-                    {'id': '1', 'name': 'A' * 100, 'quantity': 1, 'cost': 10.00}
-                ]
-            },
-            format='json'
-        )
-        
+    def test_generate_ticket_in_worker_pool(self, authenticated_api_client, settings):
+        """Test that tickets render through the process pool when TICKET_PDF_WORKERS is set"""
+        settings.TICKET_PDF_WORKERS = 1
+        try:
+            response = authenticated_api_client.post(
+                TICKET_URL,
+                {
+                    'document_type': 'ticket',
+                    'order_items': [
+                        _ITEM_2_AT_10
+                    ]
+                },
+                format='json'
+            )
+            assert pdf_pool._executor is not None
+        finally:
+            pdf_pool.shutdown_pdf_executor()
+
         assert response.status_code == status.HTTP_200_OK
-        assert response['Content-Type'] == 'application/pdf'
-    
+        pdf_content = _pdf_bytes(response)
+        assert pdf_content.startswith(b'%PDF')
+        assert b'%%EOF' in pdf_content[-32:]  # trailer sits at the very end
+
     @patch('taxes.views.generate_ticket_pdf')
     def test_generate_ticket_pdf_generation_error(self, mock_generate_pdf, authenticated_api_client):
         """Test ticket generation when PDF generation fails"""
         mock_generate_pdf.side_effect = Exception("PDF generation failed")
         
-        url = reverse('document-generate-ticket')
         response = authenticated_api_client.post(
-            url,
+            TICKET_URL,
             {
                 'document_type': 'ticket',
                 'order_items': [
-                    {'id': '1', 'name': 'Producto 1', 'quantity': 1, 'cost': 10.00}
+                    _ITEM_1_AT_10
                 ]
             },
             format='json'
@@ -284,20 +255,36 @@ class TestDocumentGenerateTicketView:
         assert 'error' in response.data
         assert 'Failed to generate PDF' in response.data['error']
     
+    def test_generate_ticket_long_product_name(self, authenticated_api_client):
+        """Test that a very long product name is accepted and handed to the PDF renderer untouched"""
+        with patch('taxes.views.generate_ticket_pdf') as mock_generate_pdf:
+            mock_generate_pdf.return_value = BytesIO(_FAKE_PDF)
+            
+            response = authenticated_api_client.post(
+                TICKET_URL,
+                {
+                    'document_type': 'ticket',
+                    'order_items': [
+                        {'id': '1', 'name': 'A' * 100, 'quantity': 1, 'cost': 10.00}
+                    ]
+                },
+                format='json'
+            )
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert mock_generate_pdf.call_args.kwargs['order_items'][0]['name'] == 'A' * 100
+    
     def test_generate_ticket_verifies_pdf_function_called(self, authenticated_api_client):
         """Test that generate_ticket_pdf is called with correct parameters"""
         with patch('taxes.views.generate_ticket_pdf') as mock_generate_pdf:
-            mock_buffer = MagicMock()
-            mock_buffer.getvalue.return_value = b'%PDF fake pdf content'
-            mock_generate_pdf.return_value = mock_buffer
+            mock_generate_pdf.return_value = BytesIO(_FAKE_PDF)
             
-            url = reverse('document-generate-ticket')
             response = authenticated_api_client.post(
-                url,
+                TICKET_URL,
                 {
                     'document_type': 'ticket',
                     'order_items': [
-                        {'id': '1', 'name': 'Producto 1', 'quantity': 2, 'cost': 10.00}
+                        _ITEM_2_AT_10
                     ],
                     'order_number': 'ORD-001',
                     'customer_name': 'Test Customer'
@@ -321,127 +308,150 @@ class TestDocumentGenerateTicketView:
             assert call_kwargs['customer_name'] == 'Test Customer'
             assert call_kwargs.get('document_type') is None  # Simple tickets don't pass document_type
     
-    def test_generate_ticket_no_sunat_connection(self, authenticated_api_client):
+    def test_generate_ticket_no_sunat_connection(self, authenticated_api_client, settings):
         """Test that generate-ticket endpoint does not require Sunat connection"""
         # This endpoint should work without Sunat credentials
-        with patch('taxes.views.settings') as mock_settings:
-            mock_settings.SUNAT_PERSONA_ID = None
-            mock_settings.SUNAT_PERSONA_TOKEN = None
-            
-            url = reverse('document-generate-ticket')
-            response = authenticated_api_client.post(
-                url,
-                {
-                    'document_type': 'ticket',
-                    'order_items': [
-                        {'id': '1', 'name': 'Producto 1', 'quantity': 1, 'cost': 10.00}
-                    ]
-                },
-                format='json'
-            )
-            
-            # Should succeed - no Sunat connection needed
-            assert response.status_code == status.HTTP_200_OK
-            assert response['Content-Type'] == 'application/pdf'
-    
-    # ============ Tests for boleta/factura PDF generation ============
-    
-    def test_generate_boleta_missing_document_id(self, authenticated_api_client):
-        """Test boleta generation without document_id or sunat_id"""
-        url = reverse('document-generate-ticket')
-        response = authenticated_api_client.post(
-            url,
-            {
-                'document_type': 'boleta'
-            },
-            format='json'
-        )
+        settings.SUNAT_PERSONA_ID = None
+        settings.SUNAT_PERSONA_TOKEN = None
         
-        assert response.status_code == status.HTTP_400_BAD_REQUEST
-        assert 'document_id' in response.data
-    
-    def test_generate_boleta_document_not_found(self, authenticated_api_client):
-        """Test boleta generation with non-existent document_id"""
-        import uuid
-        url = reverse('document-generate-ticket')
         response = authenticated_api_client.post(
-            url,
+            TICKET_URL,
             {
-                'document_type': 'boleta',
-                'document_id': str(uuid.uuid4())
+                'document_type': 'ticket',
+                'order_items': [
+                    _ITEM_1_AT_10
+                ]
             },
             format='json'
         )
         
-        assert response.status_code == status.HTTP_404_NOT_FOUND
-        assert 'not found' in response.data['error'].lower()
+        # Should succeed - no Sunat connection needed
+        assert response.status_code == status.HTTP_200_OK
+        assert response['Content-Type'] == 'application/pdf'
     
-    def test_generate_factura_document_not_found(self, authenticated_api_client):
-        """Test factura generation with non-existent sunat_id"""
-        url = reverse('document-generate-ticket')
-        response = authenticated_api_client.post(
-            url,
-            {
-                'document_type': 'factura',
-                'sunat_id': 'nonexistent-id'
-            },
-            format='json'
+
+
+def _make_linked_order(document, created_by, *, first_name, last_name, dish_price, quantity, item_price):
+    """Link document to an order with one 'Clasica' item; returns the rows in creation (FK) order.
+    
+    Instances are built with baker.prepare and written with one bulk_create per
+    table inside a single transaction. bulk_create skips Order.save(), which is
+    fine here: baker already fills order_number, the only thing save() derives.
+    """
+    with transaction.atomic():
+        category = baker.prepare(store_models.Category, name='Burgers')
+        store_models.Category.objects.bulk_create([category])
+        dish = baker.prepare(store_models.Dish, name='Clasica', price=dish_price, category=category)
+        store_models.Dish.objects.bulk_create([dish])
+        customer = baker.prepare(store_models.Customer, first_name=first_name, last_name=last_name)
+        store_models.Customer.objects.bulk_create([customer])
+        order = baker.prepare(store_models.Order, customer=customer, document=document, created_by=created_by)
+        store_models.Order.objects.bulk_create([order])
+        item = baker.prepare(
+            store_models.OrderItem,
+            order=order,
+            dish=dish,
+            category=category,
+            quantity=quantity,
+            price=item_price,
         )
-        
-        assert response.status_code == status.HTTP_404_NOT_FOUND
+        store_models.OrderItem.objects.bulk_create([item])
+    return [category, dish, customer, order, item]
+
+
+@pytest.fixture(scope='class')
+def ticket_documents(api_user, django_db_blocker):
+    """Documents shared by the boleta/factura class, keyed by name.
     
-    @patch('taxes.services.download_and_extract_xml')
-    @patch('taxes.services.parse_xml_customer_info')
-    def test_generate_boleta_success(self, mock_parse_customer, mock_download_xml, authenticated_api_client):
-        """Test successful boleta PDF generation"""
-        # Mock XML functions (not used for boleta but needed for import)
-        mock_download_xml.return_value = (None, None)
-        mock_parse_customer.return_value = {}
-        # Create a boleta document
-        document = baker.make(
+    'boleta' (3 x Clasica) and 'factura' (1 x Clasica, with an XML URL) each
+    have a linked order; 'boleta-no-order' has none. Committed once outside the
+    per-test transaction, only read by the tests and deleted after the class.
+    """
+    documents = {
+        'boleta': baker.prepare(
             models.Document,
             document_type='03',  # Boleta
             serie='B001',
             numero='00000001',
-            sunat_id='test-sunat-id',
+            sunat_id='test-sunat-id-boleta',
             sunat_status='ACEPTADO',
             status='accepted',
             amount=Decimal('100.00'),
-            sunat_issue_time=int(datetime.now().timestamp() * 1000),
+            sunat_issue_time=_SUNAT_ISSUE_TIME_MS,
+        ),
+        'factura': baker.prepare(
+            models.Document,
+            document_type='01',  # Factura
+            serie='F001',
+            numero='00000001',
+            sunat_id='test-sunat-id-factura',
+            sunat_status='ACEPTADO',
+            status='accepted',
+            amount=Decimal('118.00'),
+            xml_url='https://example.com/xml.zip',
+            sunat_issue_time=_SUNAT_ISSUE_TIME_MS,
+        ),
+        'boleta-no-order': baker.prepare(
+            models.Document,
+            document_type='03',  # Boleta
+            serie='B001',
+            numero='00000002',
+            sunat_id='test-sunat-id-no-order',
+        ),
+    }
+    with django_db_blocker.unblock():
+        models.Document.objects.bulk_create(documents.values())
+        linked = _make_linked_order(
+            documents['boleta'], api_user, first_name='Juan', last_name='Perez',
+            dish_price=Decimal('10.00'), quantity=3, item_price=Decimal('30.00'),
+        ) + _make_linked_order(
+            documents['factura'], api_user, first_name='Company', last_name='Test',
+            dish_price=Decimal('100.00'), quantity=1, item_price=Decimal('100.00'),
         )
+    yield documents
+    with django_db_blocker.unblock():
+        for obj in reversed(linked):
+            obj.delete()
+        models.Document.objects.filter(pk__in=[doc.pk for doc in documents.values()]).delete()
+
+
+@pytest.mark.django_db
+class TestDocumentGenerateBoletaFacturaView:
+    """Tests for POST /taxes/documents/generate-ticket/ - boleta/factura PDFs built from a stored Document"""
+    
+    @pytest.mark.parametrize('payload', [
+        pytest.param({'document_type': 'boleta', 'document_id': str(uuid.uuid4())}, id='boleta_by_document_id'),
+        pytest.param({'document_type': 'factura', 'sunat_id': 'nonexistent-id'}, id='factura_by_sunat_id'),
+    ])
+    def test_generate_document_not_found(self, authenticated_api_client, payload):
+        """Test boleta/factura generation for a document that does not exist"""
+        response = authenticated_api_client.post(TICKET_URL, payload, format='json')
         
-        # Create order with items
-        category = baker.make(store_models.Category, name='Burgers')
-        dish = baker.make(store_models.Dish, name='Clasica', price=Decimal('10.00'), category=category)
-        customer = baker.make(store_models.Customer, first_name='Juan', last_name='Perez')
-        order = baker.make(store_models.Order, customer=customer, document=document)
-        baker.make(
-            store_models.OrderItem,
-            order=order,
-            dish=dish,
-            category=category,
-            quantity=3,
-            price=Decimal('30.00')
-        )
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        assert 'not found' in response.data['error'].lower()
+    
+    @patch('taxes.services.download_and_extract_xml')
+    @patch('taxes.services.parse_xml_customer_info')
+    def test_generate_boleta_success(self, mock_parse_customer, mock_download_xml, authenticated_api_client, ticket_documents):
+        """Test successful boleta PDF generation"""
+        # Mock XML functions (not used for boleta but needed for import)
+        mock_download_xml.return_value = (None, None)
+        mock_parse_customer.return_value = {}
         
-        url = reverse('document-generate-ticket')
         response = authenticated_api_client.post(
-            url,
+            TICKET_URL,
             {
                 'document_type': 'boleta',
-                'document_id': str(document.id)
+                'document_id': str(ticket_documents['boleta'].id)
             },
             format='json'
         )
         
-        assert response.status_code == status.HTTP_200_OK
-        assert response['Content-Type'] == 'application/pdf'
-        assert 'filename="boleta_B001-00000001.pdf"' in response['Content-Disposition']
-        assert response.content[:4] == b'%PDF'
+        _assert_pdf_ok(response, 'boleta_B001-00000001.pdf')
     
     @patch('taxes.services.download_and_extract_xml')
     @patch('taxes.services.parse_xml_customer_info')
-    def test_generate_factura_success(self, mock_parse_customer, mock_download_xml, authenticated_api_client):
+    def test_generate_factura_success(self, mock_parse_customer, mock_download_xml, authenticated_api_client, ticket_documents):
         """Test successful factura PDF generation with customer info"""
         # Mock XML download and customer info extraction
         mock_download_xml.return_value = ('<?xml version="1.0"?><Invoice></Invoice>', None)
@@ -451,66 +461,54 @@ class TestDocumentGenerateTicketView:
             'address': 'Av. Test 123'
         }
         
-        # Create a factura document
-        document = baker.make(
-            models.Document,
-            document_type='01',  # Factura
-            serie='F001',
-            numero='00000001',
-            sunat_id='test-sunat-id',
-            sunat_status='ACEPTADO',
-            status='accepted',
-            amount=Decimal('118.00'),
-            xml_url='https://example.com/xml.zip',
-            sunat_issue_time=int(datetime.now().timestamp() * 1000),
-        )
-        
-        # Create order with items
-        category = baker.make(store_models.Category, name='Burgers')
-        dish = baker.make(store_models.Dish, name='Clasica', price=Decimal('100.00'), category=category)
-        customer = baker.make(store_models.Customer, first_name='Company', last_name='Test')
-        order = baker.make(store_models.Order, customer=customer, document=document)
-        baker.make(
-            store_models.OrderItem,
-            order=order,
-            dish=dish,
-            category=category,
-            quantity=1,
-            price=Decimal('100.00')
-        )
-        
-        url = reverse('document-generate-ticket')
         response = authenticated_api_client.post(
-            url,
+            TICKET_URL,
             {
                 'document_type': 'factura',
-                'document_id': str(document.id)
+                'document_id': str(ticket_documents['factura'].id)
             },
             format='json'
         )
         
-        assert response.status_code == status.HTTP_200_OK
-        assert response['Content-Type'] == 'application/pdf'
-        assert 'filename="factura_F001-00000001.pdf"' in response['Content-Disposition']
-        assert response.content[:4] == b'%PDF'
+        _assert_pdf_ok(response, 'factura_F001-00000001.pdf')
     
-    def test_generate_boleta_document_type_mismatch(self, authenticated_api_client):
-        """Test boleta generation with factura document type"""
-        # Create a factura document but request boleta
-        document = baker.make(
-            models.Document,
-            document_type='01',  # Factura
-            serie='F001',
-            numero='00000001',
-            sunat_id='test-sunat-id',
-        )
+    @patch('taxes.views.generate_ticket_pdf')
+    @patch('taxes.services.download_and_extract_xml')
+    @patch('taxes.services.parse_xml_customer_info')
+    def test_generate_factura_reprint_reuses_xml_customer(self, mock_parse_customer, mock_download_xml, mock_pdf, authenticated_api_client, ticket_documents):
+        """Test that reprinting a settled factura takes the customer from cache instead of the XML again"""
+        mock_download_xml.return_value = ('<?xml version="1.0"?><Invoice></Invoice>', None)
+        mock_parse_customer.return_value = {
+            'razon_social': 'Empresa Test S.A.C.',
+            'ruc': '20123456789',
+            'address': 'Av. Test 123'
+        }
+        mock_pdf.side_effect = lambda **kwargs: BytesIO(_FAKE_PDF)
+        payload = {'document_type': 'factura', 'document_id': str(ticket_documents['factura'].id)}
+        
+        for _ in range(2):
+            _assert_pdf_ok(authenticated_api_client.post(TICKET_URL, payload, format='json'), 'factura_')
+        
+        mock_download_xml.assert_called_once()
+        assert mock_pdf.call_args.kwargs['customer_ruc'] == '20123456789'
+    
+    def test_generate_boleta_query_count(self, authenticated_api_client, ticket_documents, django_assert_num_queries):
+        """Test that the order, its customer and every item's dish/category load in a fixed number of queries"""
+        payload = {'document_type': 'boleta', 'document_id': str(ticket_documents['boleta'].id)}
+        
+        # document, order + customer, items + dish + category
+        with django_assert_num_queries(3):
+            response = authenticated_api_client.post(TICKET_URL, payload, format='json')
         
-        url = reverse('document-generate-ticket')
+        _assert_pdf_ok(response, 'boleta_')
+    
+    def test_generate_boleta_document_type_mismatch(self, authenticated_api_client, ticket_documents):
+        """Test factura generation with a boleta document"""
         response = authenticated_api_client.post(
-            url,
+            TICKET_URL,
             {
-                'document_type': 'boleta',
-                'document_id': str(document.id)
+                'document_type': 'factura',
+                'document_id': str(ticket_documents['boleta'].id)
             },
             format='json'
         )
@@ -518,22 +516,13 @@ class TestDocumentGenerateTicketView:
         assert response.status_code == status.HTTP_400_BAD_REQUEST
         assert 'mismatch' in response.data['error'].lower()
     
-    def test_generate_document_without_order(self, authenticated_api_client):
+    def test_generate_document_without_order(self, authenticated_api_client, ticket_documents):
         """Test generating PDF for document without linked order"""
-        document = baker.make(
-            models.Document,
-            document_type='03',  # Boleta
-            serie='B001',
-            numero='00000001',
-            sunat_id='test-sunat-id',
-        )
-        
-        url = reverse('document-generate-ticket')
         response = authenticated_api_client.post(
-            url,
+            TICKET_URL,
             {
                 'document_type': 'boleta',
-                'document_id': str(document.id)
+                'document_id': str(ticket_documents['boleta-no-order'].id)
             },
             format='json'
         )
@@ -541,3 +530,26 @@ class TestDocumentGenerateTicketView:
         assert response.status_code == status.HTTP_404_NOT_FOUND
         assert 'order' in response.data['error'].lower()
 
+
+
+class TestPdfUtilsStaticTables:
+    """The ticket's number-word tables and font faces are module constants, not rebuilt per call"""
+    
+    @pytest.mark.parametrize('amount,expected', [
+        (Decimal('30.00'), 'Son Treinta con 00/100 Soles'),
+        (Decimal('21.50'), 'Son Veintiuno con 50/100 Soles'),
+        (Decimal('118.00'), 'Son Ciento Dieciocho con 00/100 Soles'),
+        (Decimal('1999.99'), 'Son Mil Novecientos Noventa y Nueve con 99/100 Soles'),
+    ])
+    def test_number_to_words_es(self, amount, expected):
+        """Test amounts in words after hoisting the lookup tables"""
+        assert pdf_utils.number_to_words_es(amount) == expected
+    
+    def test_ticket_pdf_streams_are_binary_flate(self):
+        """Test that page streams skip the ASCII85 wrapping (smaller, faster to encode)"""
+        pdf_content = pdf_utils.generate_ticket_pdf(
+            [{'name': 'Producto 1', 'quantity': 1, 'cost': 10.00}]
+        ).getvalue()
+        
+        assert b'/FlateDecode' in pdf_content
+        assert b'/ASCII85Decode' not in pdf_content
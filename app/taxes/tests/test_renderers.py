@@ -0,0 +1,53 @@
+import datetime
+import json
+import uuid
+from decimal import Decimal
+
+import pytest
+from django.urls import reverse
+from django.utils.functional import lazy
+from rest_framework import status
+from rest_framework.exceptions import ErrorDetail
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.serializer_helpers import ReturnDict, ReturnList
+
+from taxes.renderers import ORJSONRenderer
+
+
+_lazy_str = lazy(lambda: 'Documento', str)
+
+
+class TestORJSONRenderer:
+    """ORJSONRenderer must produce the same JSON as DRF's JSONRenderer"""
+
+    @pytest.mark.parametrize('data', [
+        pytest.param({'total_amount': Decimal('118.00'), 'synced': 3}, id='decimal'),
+        pytest.param({'id': uuid.UUID(int=1), 'day': datetime.date(2024, 6, 15)}, id='uuid_and_date'),
+        pytest.param({'error': ErrorDetail('Invalid', code='invalid'), 'label': _lazy_str()}, id='error_detail_and_lazy'),
+        pytest.param(ReturnList([ReturnDict({'serie': 'B001'}, serializer=None)], serializer=None), id='serializer_return_types'),
+        pytest.param({'elapsed': datetime.timedelta(seconds=1.5), 'ids': {'a'}}, id='timedelta_and_set'),
+        pytest.param({'sunat_ids': {0: [ErrorDetail('Too long', code='max_length')]}}, id='int_keyed_list_field_errors'),
+    ])
+    def test_matches_json_renderer(self, data):
+        """Test that orjson output decodes to the same value as JSONRenderer's"""
+        assert json.loads(ORJSONRenderer().render(data)) == json.loads(JSONRenderer().render(data))
+
+    def test_none_renders_empty_body(self):
+        """Test that a None payload (e.g. 204) renders no body, like JSONRenderer"""
+        assert ORJSONRenderer().render(None) == b''
+
+    def test_indent_falls_back_to_json_renderer(self):
+        """Test that indented output is still produced when the client asks for it"""
+        rendered = ORJSONRenderer().render({'a': 1}, 'application/json; indent=2', {})
+        assert rendered == JSONRenderer().render({'a': 1}, 'application/json; indent=2', {})
+
+
+@pytest.mark.django_db
+def test_document_list_is_rendered_with_orjson(authenticated_api_client):
+    """Test that the document endpoints answer with the orjson renderer"""
+    response = authenticated_api_client.get(reverse('document-list'))
+
+    assert response.status_code == status.HTTP_200_OK
+    assert isinstance(response.accepted_renderer, ORJSONRenderer)
+    assert response['Content-Type'] == 'application/json'
+    assert json.loads(response.content)['results'] == []
@@ -0,0 +1,176 @@
+import json
+import threading
+
+import pytest
+import requests
+from unittest.mock import patch, Mock
+from rest_framework import status
+from django.urls import reverse
+from django.db import connection
+
+from taxes import models
+
+
+# Resolved once at import; the path never changes during a run
+SYNC_BATCH_URL = reverse('document-sync-batch')
+
+
+def _sunat_get_by_id(payloads):
+    """side_effect for _SUNAT_SESSION.get: answer {sunat_id}/getById from payloads (404 when missing)"""
+    def get(endpoint, **kwargs):
+        sunat_id = endpoint.rsplit('/', 2)[-2]
+        payload = payloads.get(sunat_id)
+        if isinstance(payload, Exception):
+            raise payload
+        response = Mock()
+        response.status_code = 200 if payload is not None else 404
+        response.json.return_value = payload
+        return response
+    return get
+
+
+@pytest.mark.django_db
+class TestDocumentSyncBatchView:
+    """Tests for POST /taxes/documents/sync-batch/ - Sync several documents by sunat_id"""
+
+    def test_sync_batch_unauthenticated(self, api_client):
+        """Test that unauthenticated requests are rejected"""
+        response = api_client.post(SYNC_BATCH_URL, {'sunat_ids': ['a']}, format='json')
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    @pytest.mark.parametrize('payload', [
+        pytest.param({}, id='missing'),
+        pytest.param({'sunat_ids': []}, id='empty'),
+        pytest.param({'sunat_ids': [f'id-{i}' for i in range(101)]}, id='too_many'),
+        pytest.param({'sunat_ids': ['x' * 101]}, id='id_too_long'),
+        pytest.param({'sunat_ids': [{'id': 'a'}]}, id='id_not_a_string'),
+        pytest.param({'sunat_ids': ['a', None]}, id='null_id'),
+        pytest.param({'sunat_ids': 'a'}, id='not_a_list'),
+    ])
+    def test_sync_batch_invalid_body(self, authenticated_api_client, payload):
+        """Test that sunat_ids must be a non-empty list of at most 100 string ids of at most 100 chars"""
+        response = authenticated_api_client.post(SYNC_BATCH_URL, payload, format='json')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'sunat_ids' in response.data
+
+    def test_sync_batch_child_error_renders_as_json(self, authenticated_api_client):
+        """Test that per-item ListField errors (keyed by int index) are rendered as a 400, not a 500"""
+        response = authenticated_api_client.post(SYNC_BATCH_URL, {'sunat_ids': ['x' * 101]}, format='json')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert list(json.loads(response.content)['sunat_ids']) == ['0']
+
+    def test_sync_batch_missing_credentials(self, authenticated_api_client, settings):
+        """Test sync-batch when Sunat API credentials are not configured"""
+        settings.SUNAT_PERSONA_ID = None
+        settings.SUNAT_PERSONA_TOKEN = None
+
+        response = authenticated_api_client.post(SYNC_BATCH_URL, {'sunat_ids': ['a']}, format='json')
+
+        assert response.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
+        assert 'credentials' in response.data['error'].lower()
+
+    @patch('taxes.views._SUNAT_SESSION.get')
+    @patch('taxes.views.process_sunat_document')
+    def test_sync_batch_mixed_results(self, mock_process, mock_get, authenticated_api_client):
+        """Test that found documents are synced while 404s and network errors are reported per id"""
+        mock_get.side_effect = _sunat_get_by_id({
+            'batch-boleta': {
+                'id': 'batch-boleta',
+                'type': '03',
+                'status': 'ACEPTADO',
+                'fileName': '20482674828-03-B001-00000010',
+            },
+            'batch-factura': {
+                'id': 'batch-factura',
+                'type': '01',
+                'status': 'ACEPTADO',
+                'fileName': '20482674828-01-F001-00000010',
+            },
+            'batch-offline': requests.exceptions.ConnectionError('Connection error'),
+        })
+        mock_process.return_value = {'amount': 118.00}
+
+        response = authenticated_api_client.post(
+            SYNC_BATCH_URL,
+            {'sunat_ids': ['batch-boleta', 'batch-missing', 'batch-factura', 'batch-offline', 'batch-boleta']},
+            format='json'
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['requested'] == 4  # the repeated id is fetched once
+        assert response.data['synced'] == 2
+        assert response.data['not_found'] == ['batch-missing']
+        assert [error['sunat_id'] for error in response.data['errors']] == ['batch-offline']
+        assert mock_get.call_count == 4
+
+        synced = models.Document.objects.filter(sunat_id__startswith='batch-')
+        assert sorted(synced.values_list('sunat_id', 'document_type', 'status')) == [
+            ('batch-boleta', '03', 'accepted'),
+            ('batch-factura', '01', 'accepted'),
+        ]
+
+    @patch('taxes.views._SUNAT_SESSION.get')
+    @patch('taxes.views.process_sunat_document')
+    def test_sync_batch_processes_xml_concurrently(self, mock_process, mock_get, authenticated_api_client):
+        """Test that XML processing for the batch overlaps and each amount lands on its own document"""
+        mock_get.side_effect = _sunat_get_by_id({
+            f'batch-xml-{n}': {
+                'id': f'batch-xml-{n}',
+                'type': '03',
+                'status': 'ACEPTADO',
+                'fileName': f'20482674828-03-B001-0000002{n}',
+                'xml': f'https://example.com/batch-xml-{n}.zip',
+            }
+            for n in (1, 2)
+        })
+        # Neither call can return until both are running at once
+        barrier = threading.Barrier(2, timeout=5)
+
+        def process(sunat_doc):
+            barrier.wait()
+            return {'amount': 10.0 * int(sunat_doc['id'][-1])}
+
+        mock_process.side_effect = process
+
+        response = authenticated_api_client.post(
+            SYNC_BATCH_URL, {'sunat_ids': ['batch-xml-1', 'batch-xml-2']}, format='json'
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['synced'] == 2
+        assert response.data['errors'] == []
+        synced = models.Document.objects.filter(sunat_id__startswith='batch-xml-')
+        assert sorted((doc.sunat_id, float(doc.amount)) for doc in synced) == [
+            ('batch-xml-1', 10.0),
+            ('batch-xml-2', 20.0),
+        ]
+
+    @pytest.mark.django_db(transaction=True)
+    @patch('taxes.views._SUNAT_SESSION.get')
+    @patch('taxes.views.process_sunat_document')
+    def test_sync_batch_persists_in_one_transaction(self, mock_process, mock_get, authenticated_api_client):
+        """Test that every document of the batch is written inside a single atomic block"""
+        mock_get.side_effect = _sunat_get_by_id({
+            f'batch-tx-{n}': {'id': f'batch-tx-{n}', 'type': '03', 'status': 'ACEPTADO'}
+            for n in (1, 2, 3)
+        })
+        mock_process.return_value = {}
+        sync_from_sunat = models.Document.sync_from_sunat
+        in_atomic = []
+
+        def recording_sync(sunat_doc, processed_data=None):
+            in_atomic.append(connection.in_atomic_block)
+            return sync_from_sunat(sunat_doc, processed_data)
+
+        with patch.object(models.Document, 'sync_from_sunat', side_effect=recording_sync):
+            response = authenticated_api_client.post(
+                SYNC_BATCH_URL, {'sunat_ids': ['batch-tx-1', 'batch-tx-2', 'batch-tx-3']}, format='json'
+            )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['synced'] == 3
+        # transaction=True runs in autocommit, so this is the sync's own atomic block
+        assert in_atomic == [True, True, True]
@@ -1,30 +1,37 @@
 import pytest
+import requests
+import uuid
 from decimal import Decimal
-from datetime import datetime
 from unittest.mock import patch, Mock
-from model_bakery import baker
 from rest_framework import status
 from django.urls import reverse
 from django.conf import settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
 from taxes import models
 
 
+# Resolved once at import; the path never changes during a run
+SYNC_SINGLE_URL = reverse('document-sync-single')
+
+# Sunat issueTime (epoch ms) for mocked payloads; fixed so they are reproducible
+_FIXED_ISSUE_TIME_MS = 1_700_000_000_000
+
+
 @pytest.mark.django_db
 class TestDocumentSyncSingleView:
     """Tests for GET /taxes/documents/sync-single/ - Sync a single document by sunat_id or document_id"""
     
     def test_sync_single_unauthenticated(self, api_client):
         """Test that unauthenticated requests are rejected"""
-        url = reverse('document-sync-single')
-        response = api_client.get(url)
+        response = api_client.get(SYNC_SINGLE_URL)
         
         assert response.status_code == status.HTTP_401_UNAUTHORIZED
     
     def test_sync_single_missing_both_parameters(self, authenticated_api_client):
         """Test sync when neither sunat_id nor document_id is provided"""
-        url = reverse('document-sync-single')
-        response = authenticated_api_client.get(url)
+        response = authenticated_api_client.get(SYNC_SINGLE_URL)
         
         assert response.status_code == status.HTTP_400_BAD_REQUEST
         assert 'error' in response.data
@@ -32,8 +39,7 @@ class TestDocumentSyncSingleView:
     
     def test_sync_single_document_id_not_found(self, authenticated_api_client):
         """Test sync when document_id is provided but document doesn't exist in database"""
-        url = reverse('document-sync-single')
-        response = authenticated_api_client.get(url, {'document_id': '00000000-0000-0000-0000-000000000000'})
+        response = authenticated_api_client.get(SYNC_SINGLE_URL, {'document_id': '00000000-0000-0000-0000-000000000000'})
         
         assert response.status_code == status.HTTP_404_NOT_FOUND
         assert 'error' in response.data
@@ -42,16 +48,14 @@ class TestDocumentSyncSingleView:
     def test_sync_single_document_id_no_sunat_id(self, authenticated_api_client):
         """Test sync when document_id is provided but document doesn't have sunat_id"""
         # Create a document without sunat_id
-        doc = baker.make(
-            models.Document,
+        doc = models.Document.objects.create(
             sunat_id=None,
             serie='B001',
             numero='00000001',
             document_type='03',
         )
         
-        url = reverse('document-sync-single')
-        response = authenticated_api_client.get(url, {'document_id': str(doc.id)})
+        response = authenticated_api_client.get(SYNC_SINGLE_URL, {'document_id': str(doc.id)})
         
         assert response.status_code == status.HTTP_400_BAD_REQUEST
         assert 'error' in response.data
@@ -64,14 +68,26 @@ class TestDocumentSyncSingleView:
         mock_settings.SUNAT_PERSONA_TOKEN = None
         mock_settings.SUNAT_API_URL = "http://mock.sunat.api"
         
-        url = reverse('document-sync-single')
-        response = authenticated_api_client.get(url, {'sunat_id': 'test-sunat-id'})
+        response = authenticated_api_client.get(SYNC_SINGLE_URL, {'sunat_id': 'test-sunat-id'})
         
         assert response.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
         assert 'error' in response.data
         assert 'credentials' in response.data['error'].lower()
     
-    @patch('taxes.views.requests.get')
+    def test_sync_single_missing_credentials_skips_document_lookup(
+        self, authenticated_api_client, settings, django_assert_num_queries
+    ):
+        """Test that missing credentials are reported before the document_id lookup touches the DB"""
+        settings.SUNAT_PERSONA_ID = None
+        settings.SUNAT_PERSONA_TOKEN = None
+        
+        with django_assert_num_queries(0):
+            response = authenticated_api_client.get(SYNC_SINGLE_URL, {'document_id': str(uuid.uuid4())})
+        
+        assert response.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
+        assert 'credentials' in response.data['error'].lower()
+    
+    @patch('taxes.views._SUNAT_SESSION.get')
     def test_sync_single_document_not_found_in_sunat(self, mock_get, authenticated_api_client):
         """Test sync when document doesn't exist in Sunat API (404)"""
         sunat_id = 'non-existent-sunat-id'
@@ -81,8 +97,7 @@ class TestDocumentSyncSingleView:
         mock_response.text = 'Not Found'
         mock_get.return_value = mock_response
         
-        url = reverse('document-sync-single')
-        response = authenticated_api_client.get(url, {'sunat_id': sunat_id})
+        response = authenticated_api_client.get(SYNC_SINGLE_URL, {'sunat_id': sunat_id})
         
         assert response.status_code == status.HTTP_404_NOT_FOUND
         assert 'error' in response.data
@@ -92,12 +107,11 @@ class TestDocumentSyncSingleView:
         assert 'getById' in call_args[0][0]
         assert sunat_id in call_args[0][0]
     
-    @patch('taxes.views.requests.get')
+    @patch('taxes.views._SUNAT_SESSION.get')
     def test_sync_single_document_exists_in_db_not_in_sunat(self, mock_get, authenticated_api_client):
         """Test sync when document exists in DB but not in Sunat API"""
         # Create document in database
-        db_doc = baker.make(
-            models.Document,
+        db_doc = models.Document.objects.create(
             sunat_id='test-sunat-id-404',
             serie='B001',
             numero='00000001',
@@ -110,8 +124,7 @@ class TestDocumentSyncSingleView:
         mock_response.text = 'Not Found'
         mock_get.return_value = mock_response
         
-        url = reverse('document-sync-single')
-        response = authenticated_api_client.get(url, {'sunat_id': db_doc.sunat_id})
+        response = authenticated_api_client.get(SYNC_SINGLE_URL, {'sunat_id': db_doc.sunat_id})
         
         assert response.status_code == status.HTTP_404_NOT_FOUND
         assert 'error' in response.data
@@ -120,7 +133,7 @@ class TestDocumentSyncSingleView:
         assert 'document' in response.data
         assert response.data['document']['serie'] == db_doc.serie
     
-    @patch('taxes.views.requests.get')
+    @patch('taxes.views._SUNAT_SESSION.get')
     @patch('taxes.views.process_sunat_document')
     def test_sync_single_success_by_sunat_id(self, mock_process, mock_get, authenticated_api_client):
         """Test successful sync using sunat_id"""
@@ -133,7 +146,7 @@ class TestDocumentSyncSingleView:
             'type': '03',
             'status': 'ACEPTADO',
             'fileName': '20482674828-03-B001-00000001',
-            'issueTime': int(datetime.now().timestamp() * 1000),
+            'issueTime': _FIXED_ISSUE_TIME_MS,
             'xml': 'https://cdn.apisunat.com/doc/example.xml',
             'cdr': 'https://cdn.apisunat.com/doc/example.cdr',
         }
@@ -145,8 +158,7 @@ class TestDocumentSyncSingleView:
             'numero': '00000001',
         }
         
-        url = reverse('document-sync-single')
-        response = authenticated_api_client.get(url, {'sunat_id': sunat_id})
+        response = authenticated_api_client.get(SYNC_SINGLE_URL, {'sunat_id': sunat_id})
         
         assert response.status_code == status.HTTP_200_OK
         assert response.data['synced'] == 1
@@ -170,13 +182,12 @@ class TestDocumentSyncSingleView:
         assert call_args[1]['params']['personaId'] == settings.SUNAT_PERSONA_ID
         assert call_args[1]['params']['personaToken'] == settings.SUNAT_PERSONA_TOKEN
     
-    @patch('taxes.views.requests.get')
+    @patch('taxes.views._SUNAT_SESSION.get')
     @patch('taxes.views.process_sunat_document')
     def test_sync_single_success_by_document_id(self, mock_process, mock_get, authenticated_api_client):
         """Test successful sync using document_id (local DB ID)"""
         # Create document in database
-        db_doc = baker.make(
-            models.Document,
+        db_doc = models.Document.objects.create(
             sunat_id='test-sunat-id-from-doc-id',
             serie='B001',
             numero='00000002',
@@ -190,7 +201,7 @@ class TestDocumentSyncSingleView:
             'type': '03',
             'status': 'ACEPTADO',
             'fileName': '20482674828-03-B001-00000002',
-            'issueTime': int(datetime.now().timestamp() * 1000),
+            'issueTime': _FIXED_ISSUE_TIME_MS,
             'xml': 'https://cdn.apisunat.com/doc/example.xml',
         }
         mock_get.return_value = mock_response
@@ -201,8 +212,7 @@ class TestDocumentSyncSingleView:
             'numero': '00000002',
         }
         
-        url = reverse('document-sync-single')
-        response = authenticated_api_client.get(url, {'document_id': str(db_doc.id)})
+        response = authenticated_api_client.get(SYNC_SINGLE_URL, {'document_id': str(db_doc.id)})
         
         assert response.status_code == status.HTTP_200_OK
         assert response.data['synced'] == 1
@@ -214,13 +224,12 @@ class TestDocumentSyncSingleView:
         call_args = mock_get.call_args
         assert db_doc.sunat_id in call_args[0][0]
     
-    @patch('taxes.views.requests.get')
+    @patch('taxes.views._SUNAT_SESSION.get')
     @patch('taxes.views.process_sunat_document')
     def test_sync_single_updates_existing_document(self, mock_process, mock_get, authenticated_api_client):
         """Test that sync updates existing document in database"""
         # Create existing document
-        existing_doc = baker.make(
-            models.Document,
+        existing_doc = models.Document.objects.create(
             sunat_id='test-sunat-id-update',
             serie='B001',
             numero='00000003',
@@ -237,7 +246,7 @@ class TestDocumentSyncSingleView:
             'type': '03',
             'status': 'ACEPTADO',  # Status changed
             'fileName': '20482674828-03-B001-00000003',
-            'issueTime': int(datetime.now().timestamp() * 1000),
+            'issueTime': _FIXED_ISSUE_TIME_MS,
             'xml': 'https://cdn.apisunat.com/doc/example.xml',
         }
         mock_get.return_value = mock_response
@@ -248,18 +257,55 @@ class TestDocumentSyncSingleView:
             'numero': '00000003',
         }
         
-        url = reverse('document-sync-single')
-        response = authenticated_api_client.get(url, {'sunat_id': existing_doc.sunat_id})
+        response = authenticated_api_client.get(SYNC_SINGLE_URL, {'sunat_id': existing_doc.sunat_id})
         
         assert response.status_code == status.HTTP_200_OK
         
         # Verify document was updated
-        existing_doc.refresh_from_db()
+        existing_doc.refresh_from_db(fields=['sunat_status', 'status', 'amount'])
         assert existing_doc.sunat_status == 'ACEPTADO'
         assert existing_doc.status == 'accepted'
         assert existing_doc.amount == Decimal('118.00')
     
-    @patch('taxes.views.requests.get')
+    def test_sunat_id_lookups_are_backed_by_unique_index(self):
+        """Every sync path filters by sunat_id; the unique constraint already gives it an index"""
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(cursor, models.Document._meta.db_table)
+        
+        assert any(
+            info['unique'] and info['columns'] == ['sunat_id']
+            for info in constraints.values()
+        )
+    
+    def test_sync_from_sunat_upserts_existing_document_in_one_write(self):
+        """Test that re-syncing keeps fields Sunat omitted and costs one SELECT plus one UPDATE"""
+        existing_doc = models.Document.objects.create(
+            sunat_id='test-sunat-id-upsert',
+            serie='B001',
+            numero='00000004',
+            document_type='03',
+            sunat_status='PENDIENTE',
+            status='pending',
+            cdr_url='https://cdn.apisunat.com/doc/existing.cdr',
+        )
+        
+        with CaptureQueriesContext(connection) as ctx:
+            document = models.Document.sync_from_sunat(
+                {'id': existing_doc.sunat_id, 'status': 'RECHAZADO'},  # no cdr, no fileName
+                {'amount': 59.00},
+            )
+        
+        statements = [q['sql'].split()[0].upper() for q in ctx.captured_queries]
+        assert [sql for sql in statements if sql in ('SELECT', 'INSERT', 'UPDATE')] == ['SELECT', 'UPDATE']
+        assert document.pk == existing_doc.pk
+        existing_doc.refresh_from_db()
+        assert existing_doc.status == 'rejected'
+        assert existing_doc.sunat_status == 'RECHAZADO'
+        assert existing_doc.amount == Decimal('59.00')
+        assert existing_doc.serie == 'B001'
+        assert existing_doc.cdr_url == 'https://cdn.apisunat.com/doc/existing.cdr'
+    
+    @patch('taxes.views._SUNAT_SESSION.get')
     def test_sync_single_invalid_response_format(self, mock_get, authenticated_api_client):
         """Test sync when Sunat API returns invalid response format"""
         sunat_id = 'test-sunat-id-invalid'
@@ -269,14 +315,13 @@ class TestDocumentSyncSingleView:
         mock_response.json.return_value = 'invalid format'  # Not a dict
         mock_get.return_value = mock_response
         
-        url = reverse('document-sync-single')
-        response = authenticated_api_client.get(url, {'sunat_id': sunat_id})
+        response = authenticated_api_client.get(SYNC_SINGLE_URL, {'sunat_id': sunat_id})
         
         assert response.status_code == status.HTTP_502_BAD_GATEWAY
         assert 'error' in response.data
         assert 'Invalid response format' in response.data['error']
     
-    @patch('taxes.views.requests.get')
+    @patch('taxes.views._SUNAT_SESSION.get')
     @patch('taxes.views.process_sunat_document')
     def test_sync_single_with_xml_error(self, mock_process, mock_get, authenticated_api_client):
         """Test sync when XML processing fails but document still gets synced"""
@@ -297,8 +342,7 @@ class TestDocumentSyncSingleView:
             'error': 'Failed to download XML'
         }
         
-        url = reverse('document-sync-single')
-        response = authenticated_api_client.get(url, {'sunat_id': sunat_id})
+        response = authenticated_api_client.get(SYNC_SINGLE_URL, {'sunat_id': sunat_id})
         
         assert response.status_code == status.HTTP_200_OK
         assert response.data['synced'] == 1
@@ -308,22 +352,33 @@ class TestDocumentSyncSingleView:
         # Document should still be created even with XML error
         assert models.Document.objects.filter(sunat_id=sunat_id).exists()
     
-    @patch('taxes.views.requests.get')
+    @patch('taxes.views._SUNAT_SESSION.get')
     def test_sync_single_network_error(self, mock_get, authenticated_api_client):
         """Test sync when network error occurs"""
         sunat_id = 'test-sunat-id-network-error'
         
-        import requests
         mock_get.side_effect = requests.exceptions.RequestException("Connection error")
         
-        url = reverse('document-sync-single')
-        response = authenticated_api_client.get(url, {'sunat_id': sunat_id})
+        response = authenticated_api_client.get(SYNC_SINGLE_URL, {'sunat_id': sunat_id})
         
         assert response.status_code == status.HTTP_502_BAD_GATEWAY
         assert 'error' in response.data
         assert 'Failed to fetch' in response.data['error']
     
-    @patch('taxes.views.requests.get')
+    @patch('taxes.views._SUNAT_SESSION.get')
+    def test_sync_single_malformed_json(self, mock_get, authenticated_api_client):
+        """Test that an unparseable Sunat body is reported as a bad gateway"""
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.content = b'{"id": "test-sunat-id-bad-json",'
+        mock_get.return_value = mock_response
+        
+        response = authenticated_api_client.get(SYNC_SINGLE_URL, {'sunat_id': 'test-sunat-id-bad-json'})
+        
+        assert response.status_code == status.HTTP_502_BAD_GATEWAY
+        assert 'Invalid JSON from Sunat API' in response.data['error']
+    
+    @patch('taxes.views._SUNAT_SESSION.get')
     @patch('taxes.views.process_sunat_document')
     def test_sync_single_verifies_endpoint_format(self, mock_process, mock_get, authenticated_api_client):
         """Test that the correct endpoint format is used"""
@@ -346,8 +401,7 @@ class TestDocumentSyncSingleView:
             'numero': '00000001',
         }
         
-        url = reverse('document-sync-single')
-        response = authenticated_api_client.get(url, {'sunat_id': sunat_id})
+        response = authenticated_api_client.get(SYNC_SINGLE_URL, {'sunat_id': sunat_id})
         
         assert response.status_code == status.HTTP_200_OK
         
@@ -360,4 +414,39 @@ class TestDocumentSyncSingleView:
         assert sunat_id in endpoint
         assert 'getById' in endpoint
         assert endpoint.endswith(f'/{sunat_id}/getById') or f'/{sunat_id}/getById' in endpoint
-
+    
+    @pytest.mark.parametrize('sunat_status,expected_calls', [
+        pytest.param('ACEPTADO', 1, id='settled_is_cached'),
+        pytest.param('PENDIENTE', 2, id='pending_is_refetched'),
+    ])
+    @patch('taxes.views._SUNAT_SESSION.get')
+    @patch('taxes.views.process_sunat_document')
+    def test_sync_single_repeat_uses_cache_for_settled_documents(
+        self, mock_process, mock_get, authenticated_api_client, sunat_status, expected_calls
+    ):
+        """Test that a repeated sync reuses a settled getById payload but refetches a pending one"""
+        sunat_id = 'test-sunat-id-cached'
+        
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = {
+            'id': sunat_id,
+            'type': '03',
+            'status': sunat_status,
+            'fileName': '20482674828-03-B001-00000001',
+        }
+        mock_get.return_value = mock_response
+        
+        mock_process.return_value = {
+            'amount': 118.00,
+            'serie': 'B001',
+            'numero': '00000001',
+        }
+        
+        first = authenticated_api_client.get(SYNC_SINGLE_URL, {'sunat_id': sunat_id})
+        second = authenticated_api_client.get(SYNC_SINGLE_URL, {'sunat_id': sunat_id})
+        
+        assert first.status_code == status.HTTP_200_OK
+        assert second.status_code == status.HTTP_200_OK
+        assert second.data['document']['sunat_status'] == sunat_status
+        assert mock_get.call_count == expected_calls
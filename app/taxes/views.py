@@ -1,5 +1,12 @@
+import functools
+import logging
+import re
+import uuid
+import orjson
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from decimal import Decimal
+from io import BytesIO
 from datetime import datetime, timedelta
 from django.utils import timezone
 from rest_framework import viewsets
@@ -7,44 +14,261 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework import status
 from django.conf import settings
-from django.db.models import F, Case, When, IntegerField, Q, Sum
+from django.db import transaction
+from django.db.models import F, Q, Sum
 from django.core.exceptions import ObjectDoesNotExist
+from django.http import StreamingHttpResponse
+from django.core.cache import cache
 from .models import Document
 from .serializers import (
     DocumentSerializer,
     CreateInvoiceSerializer,
     CreateTicketSerializer,
-    GeneratePDFSerializer
+    GeneratePDFSerializer,
+    SyncBatchSerializer
 )
 from .services import process_sunat_document
 from .sunat_utils import (
+    SUNAT_SESSION as _SUNAT_SESSION,
     get_correlative,
     generate_invoice_data,
-    generate_ticket_data
+    generate_ticket_data,
+    parse_file_name
 )
 from .sync_utils import (
     process_and_sync_documents,
-    filter_today_documents
+    process_documents,
+    save_processed_documents,
+    filter_today_documents,
+    local_today_range
 )
-from .pdf_utils import generate_ticket_pdf
+from .pdf_utils import generate_ticket_pdf, iter_pdf_chunks
+from .pdf_pool import get_pdf_executor, generate_ticket_pdf_bytes
 import time
 from rest_framework.pagination import BasePagination
-from .pagination import SimplePagination
+from .pagination import SimplePagination, DocumentCursorPagination
+from .renderers import ORJSONRenderer
+from rest_framework.renderers import BrowsableAPIRenderer
 from rest_framework.permissions import IsAuthenticated
 
 
-class DocumentViewSet(viewsets.ModelViewSet):
-    # Order by: NULL sunat_issue_time first (newest), then by sunat_issue_time DESC, then created_at DESC
-    queryset = Document.objects.annotate(
-        sort_priority=Case(
-            When(sunat_issue_time__isnull=True, then=0),  # NULL = highest priority (newest)
-            default=1,  # Has value = lower priority
-            output_field=IntegerField()
+logger = logging.getLogger(__name__)
+
+
+def _sunat_json(response):
+    """
+    Decode a Sunat API reply with orjson (the getAll lists are the largest bodies we parse)
+    Decode errors are raised as requests' InvalidJSONError, so callers keep
+    handling them with the other RequestExceptions. Bodies that are not bytes
+    (stubbed responses) are decoded by the response's own .json()
+    """
+    content = response.content
+    if not isinstance(content, (bytes, bytearray)):
+        return response.json()
+    try:
+        return orjson.loads(content)
+    except orjson.JSONDecodeError as e:
+        raise requests.exceptions.InvalidJSONError(f'Invalid JSON from Sunat API: {e}', response=response) from e
+
+
+def _is_sunat_document(payload):
+    """True when a getById reply is a document object (a dict carrying its Sunat id)"""
+    return type(payload) is dict and bool(payload.get('id'))
+
+
+# Concurrent getById calls per sync (the shared session pools up to 50 connections)
+_SUNAT_FETCH_WORKERS = 8
+
+
+def _fetch_sunat_documents(sunat_url, sunat_ids, persona_id, persona_token):
+    """
+    getById every sunat_id concurrently through the shared session
+    Returns (documents, not_found_ids, errors); documents keep the request order
+    """
+    params = {
+        'personaId': persona_id,
+        'personaToken': persona_token,
+    }
+
+    def fetch(sunat_id):
+        response = _SUNAT_SESSION.get(f"{sunat_url}/{sunat_id}/getById", params=params, timeout=30)
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        return _sunat_json(response)
+
+    documents, not_found, errors = [], [], []
+    with ThreadPoolExecutor(max_workers=min(_SUNAT_FETCH_WORKERS, len(sunat_ids))) as executor:
+        futures = [executor.submit(fetch, sunat_id) for sunat_id in sunat_ids]
+        for sunat_id, future in zip(sunat_ids, futures):
+            try:
+                document = future.result()
+            except requests.exceptions.RequestException as e:
+                errors.append({'sunat_id': sunat_id, 'error': str(e)})
+                continue
+            if document is None:
+                not_found.append(sunat_id)
+            elif _is_sunat_document(document):
+                documents.append(document)
+            else:
+                errors.append({'sunat_id': sunat_id, 'error': 'Invalid response format from getById'})
+    return documents, not_found, errors
+
+
+# Sunat statuses that never change once reached; only these getById payloads are cached
+_FINAL_SUNAT_STATUSES = frozenset({'ACEPTADO', 'RECHAZADO'})
+
+# Waits between the getById polls after creating a document: dense at first,
+# since Sunat usually settles within a second or two, then doubling up to a cap
+_SYNC_POLL_DELAYS = (0.5, 1, 2, 4)
+
+# Statuses that end the create-and-sync retry loops without an acceptance
+_NOT_ACCEPTED_SUNAT_STATUSES = frozenset({'RECHAZADO', 'EXCEPCION'})
+
+
+def _sunat_document_cache_key(sunat_id):
+    return f'taxes:sunat-getById:{sunat_id}'
+
+
+def _xml_customer_cache_key(sunat_id):
+    return f'taxes:xml-customer:{sunat_id}'
+
+
+# Upper bound on how long a sync holds its lock if the worker dies mid-sync
+_SYNC_LOCK_TIMEOUT = 300  # seconds
+
+
+def _single_flight(lock_name):
+    """
+    Run a sync action one request at a time (cache.add is atomic); a concurrent
+    call is answered with 409 instead of repeating the Sunat fan-out and racing
+    on the same rows
+    The lock spans workers only on a shared cache (Redis in dev.py); with
+    base.py's local-memory cache it covers a single process
+    Each holder stores its own token and releases the lock only if it still owns
+    it, so a sync that outlived _SYNC_LOCK_TIMEOUT cannot free a newer holder's lock
+    """
+    def decorator(view_method):
+        @functools.wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            lock_key = f'taxes:sync-lock:{lock_name}'
+            token = uuid.uuid4().hex
+            if not cache.add(lock_key, token, timeout=_SYNC_LOCK_TIMEOUT):
+                return Response(
+                    {'error': 'A sync is already in progress, try again shortly'},
+                    status=status.HTTP_409_CONFLICT
+                )
+            try:
+                return view_method(self, request, *args, **kwargs)
+            finally:
+                if cache.get(lock_key) == token:
+                    cache.delete(lock_key)
+        return wrapper
+    return decorator
+
+
+# A getAll entry stays revalidatable (If-None-Match) this long after its TTL expires
+_GETALL_ETAG_LIFETIME = 3600  # seconds
+
+
+def _sunat_get_all(sunat_url, persona_id, persona_token, limit=100):
+    """
+    getAll through a short-lived shared cache
+    Calls within SUNAT_GETALL_CACHE_TTL reuse the last list; after that the list
+    is revalidated with If-None-Match when Sunat sent an ETag, and a 304 reuses it
+    """
+    cache_key = f'taxes:sunat-getAll:{persona_id}:{limit}'
+    entry = cache.get(cache_key)
+    if entry is not None and time.time() - entry['fetched_at'] < settings.SUNAT_GETALL_CACHE_TTL:
+        return entry['documents']
+
+    headers = {'If-None-Match': entry['etag']} if entry is not None and entry['etag'] else {}
+    response = _SUNAT_SESSION.get(
+        f"{sunat_url}/getAll",
+        params={
+            'personaId': persona_id,
+            'personaToken': persona_token,
+            'limit': limit
+        },
+        headers=headers,
+        timeout=30
+    )
+    if response.status_code == 304 and headers:
+        documents, etag = entry['documents'], entry['etag']
+    else:
+        response.raise_for_status()
+        documents, etag = _sunat_json(response), response.headers.get('ETag')
+
+    # Only well-formed lists are worth reusing; anything else is rejected by the caller
+    if isinstance(documents, list):
+        cache.set(
+            cache_key,
+            {'fetched_at': time.time(), 'etag': etag, 'documents': documents},
+            settings.SUNAT_GETALL_CACHE_TTL + _GETALL_ETAG_LIFETIME,
         )
-    ).order_by('sort_priority', '-sunat_issue_time', '-created_at')
+    return documents
+
+
+# Document lists: not-yet-issued documents (NULL sunat_issue_time) first, then
+# newest issue time, then newest created. Served by Document's doc_sort_idx.
+_DOCUMENT_ORDERING = (F('sunat_issue_time').desc(nulls_first=True), F('created_at').desc())
+
+# ?year= must be exactly four ASCII digits; the 1900-2100 range is checked after int()
+_YEAR_RE = re.compile(r'[0-9]{4}')
+
+
+def _render_ticket_pdf(**pdf_kwargs):
+    """
+    Render a ticket PDF, in the PDF worker pool when one is configured
+    Worker exceptions are re-raised here by future.result()
+    """
+    executor = get_pdf_executor()
+    if executor is None:
+        return generate_ticket_pdf(**pdf_kwargs)
+    future = executor.submit(generate_ticket_pdf_bytes, **pdf_kwargs)
+    return BytesIO(future.result(timeout=settings.TICKET_PDF_TIMEOUT))
+
+
+def _pdf_response(pdf_buffer, filename):
+    """
+    Stream a generated PDF buffer to the client in PDF_CHUNK_SIZE pieces
+    instead of copying the whole document into the response body
+    """
+    response = StreamingHttpResponse(iter_pdf_chunks(pdf_buffer), content_type='application/pdf')
+    response['Content-Length'] = str(pdf_buffer.getbuffer().nbytes)
+    response['Content-Disposition'] = f'inline; filename="{filename}"'
+    return response
+
+
+class DocumentViewSet(viewsets.ModelViewSet):
+    queryset = Document.objects.all()
     serializer_class = DocumentSerializer
     pagination_class = SimplePagination
     permission_classes = [IsAuthenticated]
+    renderer_classes = [ORJSONRenderer, BrowsableAPIRenderer]
+
+    @property
+    def paginator(self):
+        """
+        Page-number pagination by default; the document list switches to
+        cursor pagination with ?pagination=cursor
+        """
+        if (
+            not hasattr(self, '_paginator')
+            and self.action == 'list'
+            and self.request.query_params.get('pagination') == 'cursor'
+        ):
+            self._paginator = DocumentCursorPagination()
+        return super().paginator
+
+    def get_queryset(self):
+        """
+        Only the document lists are ordered; detail and sync actions query unordered
+        """
+        queryset = super().get_queryset()
+        if self.action in ('list', 'get_tickets', 'get_invoices'):
+            queryset = queryset.order_by(*_DOCUMENT_ORDERING)
+        return queryset
 
     def list(self, request, *args, **kwargs):
         """
@@ -54,6 +278,7 @@ class DocumentViewSet(viewsets.ModelViewSet):
         - date: specific date (YYYY-MM-DD)
         - start_date and end_date: date range (YYYY-MM-DD)
         - year: filter by year (defaults to current year)
+        - pagination: 'cursor' to page with ?cursor= instead of ?page= (newest created_at first)
         """
         queryset = self.get_queryset()
         
@@ -78,22 +303,21 @@ class DocumentViewSet(viewsets.ModelViewSet):
         now = timezone.now()
         year_param = request.query_params.get('year', None)
         if year_param:
-            try:
-                year = int(year_param)
-                if year < 1900 or year > 2100:
-                    return Response(
-                        {'error': 'Invalid year. Must be between 1900 and 2100'},
-                        status=status.HTTP_400_BAD_REQUEST
-                    )
-                # Apply year filter if explicitly provided
-                start_of_year = timezone.make_aware(datetime(year, 1, 1, 0, 0, 0))
-                end_of_year = timezone.make_aware(datetime(year + 1, 1, 1, 0, 0, 0))
-                queryset = queryset.filter(created_at__gte=start_of_year, created_at__lt=end_of_year)
-            except ValueError:
+            if not _YEAR_RE.fullmatch(year_param):
                 return Response(
                     {'error': 'Invalid year format. Must be a number'},
                     status=status.HTTP_400_BAD_REQUEST
                 )
+            year = int(year_param)
+            if year < 1900 or year > 2100:
+                return Response(
+                    {'error': 'Invalid year. Must be between 1900 and 2100'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            # Apply year filter if explicitly provided
+            start_of_year = timezone.make_aware(datetime(year, 1, 1, 0, 0, 0))
+            end_of_year = timezone.make_aware(datetime(year + 1, 1, 1, 0, 0, 0))
+            queryset = queryset.filter(created_at__gte=start_of_year, created_at__lt=end_of_year)
         elif not has_date_filters:
             # Default to current year only if no other date filters are specified
             year = now.year
@@ -212,13 +436,7 @@ class DocumentViewSet(viewsets.ModelViewSet):
         """
         Fetch tickets from database
         """
-        documents = Document.objects.filter(document_type='03').annotate(
-            sort_priority=Case(
-                When(sunat_issue_time__isnull=True, then=0),  # NULL = highest priority (newest)
-                default=1,  # Has value = lower priority
-                output_field=IntegerField()
-            )
-        ).order_by('sort_priority', '-sunat_issue_time', '-created_at')
+        documents = self.get_queryset().filter(document_type='03')
         
         documents_page = self.paginate_queryset(documents)
         serializer = DocumentSerializer(documents_page, many=True)
@@ -230,13 +448,7 @@ class DocumentViewSet(viewsets.ModelViewSet):
         """
         Fetch invoices from database
         """
-        documents = Document.objects.filter(document_type='01').annotate(
-            sort_priority=Case(
-                When(sunat_issue_time__isnull=True, then=0),  # NULL = highest priority (newest)
-                default=1,  # Has value = lower priority
-                output_field=IntegerField()
-            )
-        ).order_by('sort_priority', '-sunat_issue_time', '-created_at')
+        documents = self.get_queryset().filter(document_type='01')
         
         documents_page = self.paginate_queryset(documents)
         serializer = DocumentSerializer(documents_page, many=True)
@@ -247,7 +459,7 @@ class DocumentViewSet(viewsets.ModelViewSet):
         """
         Fetch all documents from Sunat API
         """
-        sunat_url = settings.SUNAT_API_URL
+        sunat_url = settings.SUNAT_API_URL.rstrip('/')
         persona_id = settings.SUNAT_PERSONA_ID
         persona_token = settings.SUNAT_PERSONA_TOKEN
 
@@ -258,26 +470,11 @@ class DocumentViewSet(viewsets.ModelViewSet):
             )
 
         try:
-            # Construct the full URL with endpoint
-            endpoint = f"{sunat_url.rstrip('/')}/getAll"
-            
-            # Make request to Sunat API
-            response = requests.get(
-                endpoint,
-                params={
-                    'personaId': persona_id,
-                    'personaToken': persona_token,
-                    'limit': 100
-                },
-                timeout=30
-            )
-            
-            # Raise an exception for bad status codes
-            response.raise_for_status()
-            serializer = DocumentSerializer(response.json())
+            # Fetch the document list from Sunat API (bad status codes raise)
+            sunat_documents = _sunat_get_all(sunat_url, persona_id, persona_token)
 
             # Return the response data as-is
-            return Response(response.json(), status=status.HTTP_200_OK)
+            return Response(sunat_documents, status=status.HTTP_200_OK)
             
         except requests.exceptions.RequestException as e:
             return Response(
@@ -291,12 +488,13 @@ class DocumentViewSet(viewsets.ModelViewSet):
             )
     
     @action(detail=False, methods=['get'], url_path='sync', url_name='sync')
+    @_single_flight('sync')
     def sync_documents(self, request):
         """
         Sync documents from Sunat API to database
         Downloads XML files and extracts amount information
         """
-        sunat_url = settings.SUNAT_API_URL
+        sunat_url = settings.SUNAT_API_URL.rstrip('/')
         persona_id = settings.SUNAT_PERSONA_ID
         persona_token = settings.SUNAT_PERSONA_TOKEN
 
@@ -308,18 +506,7 @@ class DocumentViewSet(viewsets.ModelViewSet):
 
         try:
             # Fetch documents from Sunat API
-            endpoint = f"{sunat_url.rstrip('/')}/getAll"
-            response = requests.get(
-                endpoint,
-                params={
-                    'personaId': persona_id,
-                    'personaToken': persona_token,
-                    'limit': 100
-                },
-                timeout=30
-            )
-            response.raise_for_status()
-            sunat_documents = response.json()
+            sunat_documents = _sunat_get_all(sunat_url, persona_id, persona_token)
             
             # Ensure it's a list
             if not isinstance(sunat_documents, list):
@@ -349,12 +536,13 @@ class DocumentViewSet(viewsets.ModelViewSet):
             )
 
     @action(detail=False, methods=['get'], url_path='sync-today', url_name='sync-today')
+    @_single_flight('sync-today')
     def sync_today_documents(self, request):
         """
         Sync only today's documents from Sunat API to database
         Downloads XML files and extracts amount information for documents issued today
         """
-        sunat_url = settings.SUNAT_API_URL
+        sunat_url = settings.SUNAT_API_URL.rstrip('/')
         persona_id = settings.SUNAT_PERSONA_ID
         persona_token = settings.SUNAT_PERSONA_TOKEN
 
@@ -366,18 +554,7 @@ class DocumentViewSet(viewsets.ModelViewSet):
 
         try:
             # Fetch documents from Sunat API
-            endpoint = f"{sunat_url.rstrip('/')}/getAll"
-            response = requests.get(
-                endpoint,
-                params={
-                    'personaId': persona_id,
-                    'personaToken': persona_token,
-                    'limit': 100
-                },
-                timeout=30
-            )
-            response.raise_for_status()
-            sunat_documents = response.json()
+            sunat_documents = _sunat_get_all(sunat_url, persona_id, persona_token)
             
             # Ensure it's a list
             if not isinstance(sunat_documents, list):
@@ -389,108 +566,76 @@ class DocumentViewSet(viewsets.ModelViewSet):
             # Filter to only today's documents
             today_documents = filter_today_documents(sunat_documents)
             
-            # Check for documents created today in our DB that are missing from Sunat's response
-            from django.utils import timezone
-            now = timezone.now()
-            db_today_documents = Document.objects.filter(created_at__date=now.date())
+            # Check for documents created today in our DB that are missing from Sunat's response.
+            # Only (sunat_id, serie, numero) tuples are read; no Document instances are built
+            start_of_day, end_of_day = local_today_range()
+            db_today_labels = {
+                sunat_id: f"{serie}-{numero}"
+                for sunat_id, serie, numero in Document.objects.filter(
+                    created_at__gte=start_of_day, created_at__lt=end_of_day,
+                    sunat_id__gt='',  # excludes NULL and empty ids
+                ).values_list('sunat_id', 'serie', 'numero')
+            }
             
             # Get Sunat IDs from API response
             sunat_response_ids = {doc.get('id') for doc in sunat_documents if doc.get('id')}
             
             # Find documents in DB that aren't in Sunat's response
-            missing_documents = []
-            for db_doc in db_today_documents:
-                if db_doc.sunat_id and db_doc.sunat_id not in sunat_response_ids:
-                    missing_documents.append(db_doc)
-            
-            # Print documents that will be synced
-            print(f"\n=== Syncing {len(today_documents)} documents today ===")
-            for doc in today_documents:
-                fileName = doc.get('fileName', '')
-                # Extract serie and numero from fileName: 20482674828-01-F001-00000001
-                if fileName:
-                    parts = fileName.split('-')
-                    if len(parts) >= 4:
-                        serie = parts[2]
-                        numero = parts[3]
-                        doc_type = parts[1]  # '01' for invoice, '03' for ticket
-                        print(f"  - Document: {serie}-{numero} (Type: {doc_type}, Sunat ID: {doc.get('id', 'N/A')})")
+            missing_ids = sorted(db_today_labels.keys() - sunat_response_ids)
+            
+            # Log documents that will be synced
+            logger.info("Syncing %d documents today", len(today_documents))
+            if logger.isEnabledFor(logging.DEBUG):
+                for doc in today_documents:
+                    fileName = doc.get('fileName', '')
+                    # Extract serie and numero from fileName: 20482674828-01-F001-00000001
+                    if fileName:
+                        name_parts = parse_file_name(fileName)
+                        if name_parts:
+                            # doc_type: '01' for invoice, '03' for ticket
+                            logger.debug(
+                                "Document: %s-%s (Type: %s, Sunat ID: %s)",
+                                name_parts['serie'], name_parts['numero'], name_parts['doc_type'], doc.get('id', 'N/A'),
+                            )
+                        else:
+                            logger.debug("Document: %s (Sunat ID: %s)", fileName, doc.get('id', 'N/A'))
                     else:
-                        print(f"  - Document: {fileName} (Sunat ID: {doc.get('id', 'N/A')})")
-                else:
-                    print(f"  - Document: No fileName (Sunat ID: {doc.get('id', 'N/A')})")
+                        logger.debug("Document: No fileName (Sunat ID: %s)", doc.get('id', 'N/A'))
             
             # Try to fetch missing documents individually using getById
+            found_documents = []
             missing_synced_count = 0
             missing_errors = []
             
-            if missing_documents:
-                print(f"\n⚠️  INFO: {len(missing_documents)} document(s) created today are not in Sunat API /getAll response.")
-                print(f"  Attempting to fetch them individually using getById endpoint...")
+            if missing_ids:
+                logger.info(
+                    "%d document(s) created today are not in Sunat API /getAll response; fetching them with getById",
+                    len(missing_ids),
+                )
                 
-                for db_doc in missing_documents:
-                    if not db_doc.sunat_id:
-                        print(f"  - SKIP: {db_doc.serie}-{db_doc.numero} (no sunat_id)")
-                        continue
-                    
-                    try:
-                        # Fetch individual document using getById
-                        endpoint = f"{sunat_url.rstrip('/')}/{db_doc.sunat_id}/getById"
-                        response = requests.get(
-                            endpoint,
-                            params={
-                                'personaId': persona_id,
-                                'personaToken': persona_token,
-                            },
-                            timeout=30
-                        )
-                        
-                        if response.status_code == 200:
-                            target_document = response.json()
-                            if isinstance(target_document, dict) and target_document.get('id'):
-                                # Process and sync this document
-                                processed_data = process_sunat_document(target_document)
-                                document = Document.sync_from_sunat(target_document, processed_data)
-                                if document:
-                                    missing_synced_count += 1
-                                    print(f"  ✓ Synced missing: {db_doc.serie}-{db_doc.numero} (Sunat ID: {db_doc.sunat_id})")
-                                    if processed_data.get('error'):
-                                        missing_errors.append({
-                                            'sunat_id': db_doc.sunat_id,
-                                            'xml_url': target_document.get('xml'),
-                                            'error': processed_data['error']
-                                        })
-                                else:
-                                    missing_errors.append({
-                                        'sunat_id': db_doc.sunat_id,
-                                        'error': 'Failed to sync document'
-                                    })
-                            else:
-                                missing_errors.append({
-                                    'sunat_id': db_doc.sunat_id,
-                                    'error': 'Invalid response format from getById'
-                                })
-                        elif response.status_code == 404:
-                            print(f"  - NOT FOUND: {db_doc.serie}-{db_doc.numero} (Sunat ID: {db_doc.sunat_id}) - Document not indexed in Sunat yet")
-                        else:
-                            missing_errors.append({
-                                'sunat_id': db_doc.sunat_id,
-                                'error': f'HTTP {response.status_code}: {response.text[:200]}'
-                            })
-                    except Exception as e:
-                        missing_errors.append({
-                            'sunat_id': db_doc.sunat_id,
-                            'error': str(e)
-                        })
-                        print(f"  - ERROR: {db_doc.serie}-{db_doc.numero} - {str(e)}")
+                # getById every missing document concurrently over the pooled session
+                found_documents, not_found_ids, missing_errors = _fetch_sunat_documents(
+                    sunat_url, missing_ids, persona_id, persona_token
+                )
+                for sunat_id in not_found_ids:
+                    logger.info("Not found: %s (Sunat ID: %s) - Document not indexed in Sunat yet", db_today_labels[sunat_id], sunat_id)
+            
+            # Download the XML of the getById and getAll documents in one pool, then
+            # persist both batches in a single transaction (one COMMIT per sync).
+            # No Sunat/XML call runs while the transaction is open.
+            processed = process_documents(found_documents + today_documents, process_sunat_document)
+            with transaction.atomic():
+                if found_documents:
+                    missing_synced_count, sync_errors = save_processed_documents(
+                        found_documents, processed[:len(found_documents)]
+                    )
+                    missing_errors += sync_errors
                 
-                if missing_synced_count > 0:
-                    print(f"  ✓ Successfully synced {missing_synced_count} missing document(s)")
-            
-            print("=" * 50 + "\n")
+                # Sync documents from getAll
+                synced_count, errors = save_processed_documents(today_documents, processed[len(found_documents):])
             
-            # Process and sync documents from getAll
-            synced_count, errors = process_and_sync_documents(today_documents, process_sunat_document)
+            if missing_synced_count > 0:
+                logger.info("Synced %d missing document(s)", missing_synced_count)
             
             # Combine counts and errors
             total_synced = synced_count + missing_synced_count
@@ -500,9 +645,9 @@ class DocumentViewSet(viewsets.ModelViewSet):
                 'synced': total_synced,
                 'synced_from_getall': synced_count,
                 'synced_from_getbyid': missing_synced_count,
-                'total_today': len(today_documents) + len(missing_documents) if missing_documents else len(today_documents),
+                'total_today': len(today_documents) + len(missing_ids),
                 'total_fetched': len(sunat_documents),
-                'missing_count': len(missing_documents) if missing_documents else 0,
+                'missing_count': len(missing_ids),
                 'errors': all_errors
             }, status=status.HTTP_200_OK)
             
@@ -526,13 +671,24 @@ class DocumentViewSet(viewsets.ModelViewSet):
             sunat_id: The Sunat document ID to sync (optional if document_id is provided)
             document_id: The local database document ID (UUID) to sync (optional if sunat_id is provided)
         """
+        # Without credentials nothing below can succeed; fail before any DB or HTTP work
+        persona_id = settings.SUNAT_PERSONA_ID
+        persona_token = settings.SUNAT_PERSONA_TOKEN
+        
+        if not persona_id or not persona_token:
+            return Response(
+                {'error': 'Sunat API credentials not configured'},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+        
         sunat_id = request.query_params.get('sunat_id')
         document_id = request.query_params.get('document_id')
         
         # If document_id is provided, look up the sunat_id from our database
         if document_id and not sunat_id:
             try:
-                db_document = Document.objects.get(id=document_id)
+                # Only the columns the lookup and its error reply read
+                db_document = Document.objects.only('id', 'sunat_id', 'serie', 'numero').get(id=document_id)
                 sunat_id = db_document.sunat_id
                 if not sunat_id:
                     return Response(
@@ -546,7 +702,7 @@ class DocumentViewSet(viewsets.ModelViewSet):
                         },
                         status=status.HTTP_400_BAD_REQUEST
                     )
-                print(f"Found document in database by ID: {db_document.serie}-{db_document.numero} (Sunat ID: {sunat_id})")
+                logger.debug("Found document in database by ID: %s-%s (Sunat ID: %s)", db_document.serie, db_document.numero, sunat_id)
             except Document.DoesNotExist:
                 return Response(
                     {'error': f'Document with id "{document_id}" not found in database'},
@@ -559,85 +715,74 @@ class DocumentViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        persona_id = settings.SUNAT_PERSONA_ID
-        persona_token = settings.SUNAT_PERSONA_TOKEN
-        
-        if not persona_id or not persona_token:
-            return Response(
-                {'error': 'Sunat API credentials not configured'},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
-        
         try:
-            # Check if document exists in our database
-            try:
-                db_document = Document.objects.get(sunat_id=sunat_id)
-                print(f"Found document in database: {db_document.serie}-{db_document.numero}")
-            except Document.DoesNotExist:
-                db_document = None
-            
-            # Fetch single document from Sunat API using getById endpoint
-            sunat_url = settings.SUNAT_API_URL
-            # Base URL is already https://apisunat.com/api/documents/, so we just add {id}/getById
-            endpoint = f"{sunat_url.rstrip('/')}/{sunat_id}/getById"
-            print(f"Fetching document from Sunat API: {endpoint}")
-            print(f"Params: personaId={persona_id}, personaToken={'*' * len(persona_token) if persona_token else None}")
-            
-            response = requests.get(
-                endpoint,
-                params={
-                    'personaId': persona_id,
-                    'personaToken': persona_token,
-                },
-                timeout=30
-            )
-            
-            print(f"Sunat API response status: {response.status_code}")
+            # Settled documents re-synced within the TTL are served from the cache
+            cache_key = _sunat_document_cache_key(sunat_id)
+            target_document = cache.get(cache_key)
+            if target_document is not None:
+                logger.debug("Using cached Sunat document: %s", sunat_id)
+            else:
+                # Fetch single document from Sunat API using getById endpoint
+                sunat_url = settings.SUNAT_API_URL.rstrip('/')
+                # Base URL is already https://apisunat.com/api/documents/, so we just add {id}/getById
+                endpoint = f"{sunat_url}/{sunat_id}/getById"
+                logger.debug("Fetching document from Sunat API: %s", endpoint)
+            
+                response = _SUNAT_SESSION.get(
+                    endpoint,
+                    params={
+                        'personaId': persona_id,
+                        'personaToken': persona_token,
+                    },
+                    timeout=30
+                )
             
-            # Handle 404 or other errors
-            if response.status_code == 404:
-                if db_document:
-                    return Response(
-                        {
-                            'error': f'Document {db_document.serie}-{db_document.numero} not found in Sunat API',
-                            'document': {
-                                'serie': db_document.serie,
-                                'numero': db_document.numero,
-                                'sunat_id': db_document.sunat_id,
-                                'status': db_document.sunat_status,
-                                'amount': str(db_document.amount) if db_document.amount else None,
+                logger.debug("Sunat API response status: %s", response.status_code)
+            
+                # Handle 404 or other errors
+                if response.status_code == 404:
+                    # Only a 404 reply needs the local copy, so the happy path skips this query
+                    db_document = Document.objects.only(
+                        'serie', 'numero', 'sunat_id', 'sunat_status', 'amount'
+                    ).filter(sunat_id=sunat_id).first()
+                    if db_document:
+                        return Response(
+                            {
+                                'error': f'Document {db_document.serie}-{db_document.numero} not found in Sunat API',
+                                'document': {
+                                    'serie': db_document.serie,
+                                    'numero': db_document.numero,
+                                    'sunat_id': db_document.sunat_id,
+                                    'status': db_document.sunat_status,
+                                    'amount': str(db_document.amount) if db_document.amount else None,
+                                },
+                                'message': 'Document exists in database but was not found in Sunat API. It may not be indexed yet.'
                             },
-                            'message': 'Document exists in database but was not found in Sunat API. It may not be indexed yet.'
-                        },
-                        status=status.HTTP_404_NOT_FOUND
-                    )
-                else:
-                    return Response(
-                        {
-                            'error': f'Document with sunat_id "{sunat_id}" not found in Sunat API',
-                            'message': 'Document does not exist in Sunat API or database.'
-                        },
-                        status=status.HTTP_404_NOT_FOUND
-                    )
+                            status=status.HTTP_404_NOT_FOUND
+                        )
+                    else:
+                        return Response(
+                            {
+                                'error': f'Document with sunat_id "{sunat_id}" not found in Sunat API',
+                                'message': 'Document does not exist in Sunat API or database.'
+                            },
+                            status=status.HTTP_404_NOT_FOUND
+                        )
             
-            response.raise_for_status()
-            target_document = response.json()
+                response.raise_for_status()
+                target_document = _sunat_json(response)
             
-            # Check if we got a valid document object
-            if not isinstance(target_document, dict) or not target_document.get('id'):
-                return Response(
-                    {'error': 'Invalid response format from Sunat API'},
-                    status=status.HTTP_502_BAD_GATEWAY
-                )
+                # Check if we got a valid document object
+                if not _is_sunat_document(target_document):
+                    return Response(
+                        {'error': 'Invalid response format from Sunat API'},
+                        status=status.HTTP_502_BAD_GATEWAY
+                    )
+                
+                if str(target_document.get('status', '')).upper() in _FINAL_SUNAT_STATUSES:
+                    cache.set(cache_key, target_document, settings.SUNAT_DOCUMENT_CACHE_TTL)
             
-            # Print document info
-            fileName = target_document.get('fileName', '')
-            if fileName:
-                parts = fileName.split('-')
-                if len(parts) >= 4:
-                    serie = parts[2]
-                    numero = parts[3]
-                    print(f"Syncing single document: {serie}-{numero} (Sunat ID: {sunat_id})")
+            logger.info("Syncing single document: %s (Sunat ID: %s)", target_document.get('fileName', ''), sunat_id)
             
             # Process and sync the document
             synced_count, errors = process_and_sync_documents([target_document], process_sunat_document)
@@ -685,13 +830,65 @@ class DocumentViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+    @action(detail=False, methods=['post'], url_path='sync-batch', url_name='sync-batch')
+    @_single_flight('sync-batch')
+    def sync_batch(self, request):
+        """
+        Sync several documents from Sunat API by sunat_id in one request
+        
+        The getById calls run concurrently over the shared keep-alive session,
+        then every fetched document is synced in a single pass.
+        
+        Request body:
+        {
+            "sunat_ids": ["675c532840264100151a3644", ...]  // 1 to 100 ids
+        }
+        """
+        persona_id = settings.SUNAT_PERSONA_ID
+        persona_token = settings.SUNAT_PERSONA_TOKEN
+        
+        if not persona_id or not persona_token:
+            return Response(
+                {'error': 'Sunat API credentials not configured'},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+        
+        serializer = SyncBatchSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Drop repeated ids, keeping the caller's order
+        sunat_ids = list(dict.fromkeys(serializer.validated_data['sunat_ids']))
+        
+        try:
+            sunat_url = settings.SUNAT_API_URL.rstrip('/')
+            documents, not_found, fetch_errors = _fetch_sunat_documents(
+                sunat_url, sunat_ids, persona_id, persona_token
+            )
+            synced_count, sync_errors = process_and_sync_documents(documents, process_sunat_document)
+            
+            return Response(
+                {
+                    'requested': len(sunat_ids),
+                    'synced': synced_count,
+                    'not_found': not_found,
+                    'errors': fetch_errors + sync_errors
+                },
+                status=status.HTTP_200_OK
+            )
+        except Exception as e:
+            return Response(
+                {'error': f'Unexpected error: {str(e)}'},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
     @action(detail=False, methods=['post'], url_path='create-invoice')
     def create_invoice(self, request):
         """
         Create an invoice (factura) in Sunat and sync it
         
         After creating the document, attempts to sync it from Sunat API
-        with retries until status is ACEPTADO (1s, 2s, 3s, 5s delays)
+        with retries until status is ACEPTADO (0.5s, 1s, 2s, 4s delays)
         
         Request body:
         {
@@ -704,7 +901,7 @@ class DocumentViewSet(viewsets.ModelViewSet):
             "order_id": 123  // Optional: Link the created document to an order
         }
         """
-        print('create_invoice request.data', request.data)
+        logger.debug("create_invoice request.data %s", request.data)
         serializer = CreateInvoiceSerializer(data=request.data)
         if not serializer.is_valid():
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -740,7 +937,7 @@ class DocumentViewSet(viewsets.ModelViewSet):
             # Send to Sunat API
             # According to docs: POST /personas/v1/sendBill
             send_bill_url = "https://back.apisunat.com/personas/v1/sendBill"
-            response = requests.post(
+            response = _SUNAT_SESSION.post(
                 send_bill_url,
                 json=invoice_data,
                 headers={'Content-Type': 'application/json'},
@@ -759,7 +956,7 @@ class DocumentViewSet(viewsets.ModelViewSet):
                     status=status.HTTP_502_BAD_GATEWAY
                 )
             
-            sunat_response = response.json()
+            sunat_response = _sunat_json(response)
             
             # Check if Sunat returned an error
             if sunat_response.get('status') == 'ERROR':
@@ -775,9 +972,9 @@ class DocumentViewSet(viewsets.ModelViewSet):
             fileName = invoice_data.get('fileName', '')
             
             # Parse fileName: 20482674828-01-F001-00000001
-            parts = fileName.split('-')
-            serie = parts[2] if len(parts) >= 4 else ''
-            numero = parts[3] if len(parts) >= 4 else ''
+            name_parts = parse_file_name(fileName) or {}
+            serie = name_parts.get('serie', '')
+            numero = name_parts.get('numero', '')
             
             # Calculate total from order items (exactly what user sent)
             total_amount = sum(float(item.get('cost', 0)) * float(item.get('quantity', 0)) for item in order_items)
@@ -810,21 +1007,23 @@ class DocumentViewSet(viewsets.ModelViewSet):
                     # Don't fail the request, just log or ignore
                     pass
             
-            # Try to sync the document with retries (1s, 2s, 3s, 5s)
+            # Try to sync the document, polling getById on _SYNC_POLL_DELAYS
             # Keep retrying until status is ACEPTADO (accepted)
             sunat_id = document.sunat_id
-            delays = [1, 2, 3, 5]  # Wait 1s before first attempt, then 2s, 3s, 5s
-            sunat_url = settings.SUNAT_API_URL
-            max_attempts = len(delays)
+            delays = _SYNC_POLL_DELAYS
+            sunat_url = settings.SUNAT_API_URL.rstrip('/')
+            max_attempts = len(delays) + 1  # the first poll runs without waiting
             
             sync_start_time = time.time()
             synced_successfully = False
+            # Set while the synced row is newer than `document`; it is re-read once, not per attempt
+            document_stale = False
             attempts_made = 0
             
-            print(f"\n{'='*60}")
-            print(f"SYNC: Starting sync for document {sunat_id} ({document.serie}-{document.numero})")
-            print(f"      Will retry until status is ACEPTADO")
-            print(f"{'='*60}")
+            logger.info(
+                "Starting sync for document %s (%s-%s); will retry until status is ACEPTADO",
+                sunat_id, document.serie, document.numero,
+            )
             
             # Try syncing with retries until we get ACEPTADO status
             for attempt in range(max_attempts):
@@ -835,14 +1034,14 @@ class DocumentViewSet(viewsets.ModelViewSet):
                     # Wait before each attempt (except first one)
                     if attempt > 0:
                         delay = delays[attempt - 1]
-                        print(f"⏳ Waiting {delay}s before sync attempt {attempts_made}/{max_attempts}...")
+                        logger.debug("Waiting %ss before sync attempt %d/%d", delay, attempts_made, max_attempts)
                         time.sleep(delay)
                     else:
-                        print(f"🔄 Sync attempt {attempts_made}/{max_attempts}: Fetching from Sunat...")
+                        logger.debug("Sync attempt %d/%d: fetching from Sunat", attempts_made, max_attempts)
                     
                     # Fetch document from Sunat (same as sync_single)
-                    endpoint = f"{sunat_url.rstrip('/')}/{sunat_id}/getById"
-                    response = requests.get(
+                    endpoint = f"{sunat_url}/{sunat_id}/getById"
+                    response = _SUNAT_SESSION.get(
                         endpoint,
                         params={
                             'personaId': persona_id,
@@ -853,93 +1052,93 @@ class DocumentViewSet(viewsets.ModelViewSet):
                     
                     if response.status_code == 404:
                         attempt_time = time.time() - attempt_start_time
-                        print(f"❌ Attempt {attempts_made} failed: Document not found yet (took {attempt_time:.2f}s)")
+                        logger.info("Attempt %d failed: document not found yet (took %.2fs)", attempts_made, attempt_time)
                         if attempts_made < max_attempts:
                             continue
                         else:
                             break
                     
                     response.raise_for_status()
-                    sunat_doc = response.json()
+                    sunat_doc = _sunat_json(response)
                     
-                    if not isinstance(sunat_doc, dict) or not sunat_doc.get('id'):
+                    if not _is_sunat_document(sunat_doc):
                         attempt_time = time.time() - attempt_start_time
-                        print(f"❌ Attempt {attempts_made} failed: Invalid response format (took {attempt_time:.2f}s)")
+                        logger.warning("Attempt %d failed: invalid response format (took %.2fs)", attempts_made, attempt_time)
                         continue
                     
                     # Check the status from Sunat
                     sunat_status = sunat_doc.get('status', '').upper()
-                    print(f"✅ Document found! Status: {sunat_status}")
+                    logger.debug("Document found, status: %s", sunat_status)
                     
                     # Sync the document (even if status is not ACEPTADO yet)
                     synced_count, errors = process_and_sync_documents([sunat_doc], process_sunat_document)
                     
                     if synced_count > 0:
-                        # Refresh the document from database to get all updates
-                        document.refresh_from_db()
+                        document_stale = True
                         
                         # Check if status is ACEPTADO - only then we're done
                         if sunat_status == 'ACEPTADO':
                             synced_successfully = True
+                            document.refresh_from_db()
+                            document_stale = False
                             attempt_time = time.time() - attempt_start_time
                             total_time = time.time() - sync_start_time
                             
-                            print(f"\n{'='*60}")
-                            print(f"✅ SYNC SUCCESS - DOCUMENT ACCEPTED!")
-                            print(f"   Document: {document.serie}-{document.numero}")
-                            print(f"   Status: {document.sunat_status} -> {document.status}")
-                            print(f"   Amount: {document.amount}")
-                            print(f"   Attempts: {attempts_made}/{max_attempts}")
-                            print(f"   Attempt time: {attempt_time:.2f}s")
-                            print(f"   Total time: {total_time:.2f}s")
-                            print(f"{'='*60}\n")
+                            logger.info(
+                                "Sync success, document accepted: %s-%s (status %s -> %s, amount %s, "
+                                "attempts %d/%d, attempt time %.2fs, total time %.2fs)",
+                                document.serie, document.numero, document.sunat_status, document.status,
+                                document.amount, attempts_made, max_attempts, attempt_time, total_time,
+                            )
                             break
-                        elif sunat_status in ['RECHAZADO', 'EXCEPCION']:
+                        elif sunat_status in _NOT_ACCEPTED_SUNAT_STATUSES:
                             # Final status but not accepted - stop retrying
+                            document.refresh_from_db()
+                            document_stale = False
                             attempt_time = time.time() - attempt_start_time
                             total_time = time.time() - sync_start_time
-                            print(f"\n{'='*60}")
-                            print(f"⚠️  DOCUMENT NOT ACCEPTED")
-                            print(f"   Document: {document.serie}-{document.numero}")
-                            print(f"   Status: {document.sunat_status} -> {document.status}")
-                            print(f"   Attempts: {attempts_made}/{max_attempts}")
-                            print(f"   Total time: {total_time:.2f}s")
-                            print(f"{'='*60}\n")
+                            logger.warning(
+                                "Document not accepted: %s-%s (status %s -> %s, attempts %d/%d, total time %.2fs)",
+                                document.serie, document.numero, document.sunat_status, document.status,
+                                attempts_made, max_attempts, total_time,
+                            )
                             break
                         else:
                             # Status is still PENDIENTE or other - keep retrying
                             attempt_time = time.time() - attempt_start_time
-                            print(f"⏳ Status is {sunat_status}, not ACEPTADO yet. Will retry... (took {attempt_time:.2f}s)")
+                            logger.debug("Status is %s, not ACEPTADO yet; will retry (took %.2fs)", sunat_status, attempt_time)
                             if attempts_made < max_attempts:
                                 continue
                             else:
-                                print(f"⚠️  Max attempts reached. Status is still {sunat_status}, not ACEPTADO.")
+                                logger.warning("Max attempts reached; status is still %s, not ACEPTADO", sunat_status)
                                 break
                     else:
                         attempt_time = time.time() - attempt_start_time
-                        print(f"⚠️  Attempt {attempts_made} failed: Sync returned 0 documents (took {attempt_time:.2f}s)")
+                        logger.warning("Attempt %d failed: sync returned 0 documents (took %.2fs)", attempts_made, attempt_time)
                         
                 except requests.exceptions.RequestException as e:
                     attempt_time = time.time() - attempt_start_time
-                    print(f"❌ Attempt {attempts_made} failed: Network error - {str(e)} (took {attempt_time:.2f}s)")
+                    logger.warning("Attempt %d failed: network error - %s (took %.2fs)", attempts_made, e, attempt_time)
                     if attempts_made < max_attempts:
                         continue
                 except Exception as e:
                     attempt_time = time.time() - attempt_start_time
-                    print(f"❌ Attempt {attempts_made} failed: {str(e)} (took {attempt_time:.2f}s)")
+                    logger.warning("Attempt %d failed: %s (took %.2fs)", attempts_made, e, attempt_time)
                     if attempts_made < max_attempts:
                         continue
             
+            # Pick up the last synced state (still pending) for the response
+            if document_stale:
+                document.refresh_from_db()
+            
             # Final summary
             if not synced_successfully:
                 total_time = time.time() - sync_start_time
-                print(f"\n{'='*60}")
-                print(f"⚠️  SYNC FAILED (document created but not synced)")
-                print(f"   Document: {document.serie}-{document.numero}")
-                print(f"   Attempts: {attempts_made}/{max_attempts}")
-                print(f"   Total time: {total_time:.2f}s")
-                print(f"   Use /sync-single/?sunat_id={sunat_id} to retry later")
-                print(f"{'='*60}\n")
+                logger.warning(
+                    "Sync failed, document created but not synced: %s-%s (attempts %d/%d, total time %.2fs); "
+                    "use /sync-single/?sunat_id=%s to retry later",
+                    document.serie, document.numero, attempts_made, max_attempts, total_time, sunat_id,
+                )
             
             # Return created document (synced if successful)
             doc_serializer = DocumentSerializer(document)
@@ -962,7 +1161,7 @@ class DocumentViewSet(viewsets.ModelViewSet):
         Create a ticket (boleta) in Sunat and sync it
         
         After creating the document, attempts to sync it from Sunat API
-        with retries: 1s, 2s, 3s, 5s delays
+        with retries: 0.5s, 1s, 2s, 4s delays
         
         Request body:
         {
@@ -972,7 +1171,7 @@ class DocumentViewSet(viewsets.ModelViewSet):
             "order_id": 123  // Optional: Link the created document to an order
         }
         """
-        print('create_ticket request.data', request.data)
+        logger.debug("create_ticket request.data %s", request.data)
         serializer = CreateTicketSerializer(data=request.data)
         if not serializer.is_valid():
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -1005,7 +1204,7 @@ class DocumentViewSet(viewsets.ModelViewSet):
             # Send to Sunat API
             # According to docs: POST /personas/v1/sendBill
             send_bill_url = "https://back.apisunat.com/personas/v1/sendBill"
-            response = requests.post(
+            response = _SUNAT_SESSION.post(
                 send_bill_url,
                 json=ticket_data,
                 headers={'Content-Type': 'application/json'},
@@ -1024,7 +1223,7 @@ class DocumentViewSet(viewsets.ModelViewSet):
                     status=status.HTTP_502_BAD_GATEWAY
                 )
             
-            sunat_response = response.json()
+            sunat_response = _sunat_json(response)
             
             # Check if Sunat returned an error
             if sunat_response.get('status') == 'ERROR':
@@ -1040,9 +1239,9 @@ class DocumentViewSet(viewsets.ModelViewSet):
             fileName = ticket_data.get('fileName', '')
             
             # Parse fileName: 20482674828-03-B001-00000001
-            parts = fileName.split('-')
-            serie = parts[2] if len(parts) >= 4 else ''
-            numero = parts[3] if len(parts) >= 4 else ''
+            name_parts = parse_file_name(fileName) or {}
+            serie = name_parts.get('serie', '')
+            numero = name_parts.get('numero', '')
             
             # Calculate total from order items (exactly what user sent)
             total_amount = sum(float(item.get('cost', 0)) * float(item.get('quantity', 0)) for item in order_items)
@@ -1075,21 +1274,23 @@ class DocumentViewSet(viewsets.ModelViewSet):
                     # Don't fail the request, just log or ignore
                     pass
             
-            # Try to sync the document with retries (1s, 2s, 3s, 5s)
+            # Try to sync the document, polling getById on _SYNC_POLL_DELAYS
             # Keep retrying until status is ACEPTADO (accepted)
             sunat_id = document.sunat_id
-            delays = [1, 2, 3, 5]  # Wait 1s before first attempt, then 2s, 3s, 5s
-            sunat_url = settings.SUNAT_API_URL
-            max_attempts = len(delays)
+            delays = _SYNC_POLL_DELAYS
+            sunat_url = settings.SUNAT_API_URL.rstrip('/')
+            max_attempts = len(delays) + 1  # the first poll runs without waiting
             
             sync_start_time = time.time()
             synced_successfully = False
+            # Set while the synced row is newer than `document`; it is re-read once, not per attempt
+            document_stale = False
             attempts_made = 0
             
-            print(f"\n{'='*60}")
-            print(f"SYNC: Starting sync for document {sunat_id} ({document.serie}-{document.numero})")
-            print(f"      Will retry until status is ACEPTADO")
-            print(f"{'='*60}")
+            logger.info(
+                "Starting sync for document %s (%s-%s); will retry until status is ACEPTADO",
+                sunat_id, document.serie, document.numero,
+            )
             
             # Try syncing with retries until we get ACEPTADO status
             for attempt in range(max_attempts):
@@ -1100,14 +1301,14 @@ class DocumentViewSet(viewsets.ModelViewSet):
                     # Wait before each attempt (except first one)
                     if attempt > 0:
                         delay = delays[attempt - 1]
-                        print(f"⏳ Waiting {delay}s before sync attempt {attempts_made}/{max_attempts}...")
+                        logger.debug("Waiting %ss before sync attempt %d/%d", delay, attempts_made, max_attempts)
                         time.sleep(delay)
                     else:
-                        print(f"🔄 Sync attempt {attempts_made}/{max_attempts}: Fetching from Sunat...")
+                        logger.debug("Sync attempt %d/%d: fetching from Sunat", attempts_made, max_attempts)
                     
                     # Fetch document from Sunat (same as sync_single)
-                    endpoint = f"{sunat_url.rstrip('/')}/{sunat_id}/getById"
-                    response = requests.get(
+                    endpoint = f"{sunat_url}/{sunat_id}/getById"
+                    response = _SUNAT_SESSION.get(
                         endpoint,
                         params={
                             'personaId': persona_id,
@@ -1118,93 +1319,93 @@ class DocumentViewSet(viewsets.ModelViewSet):
                     
                     if response.status_code == 404:
                         attempt_time = time.time() - attempt_start_time
-                        print(f"❌ Attempt {attempts_made} failed: Document not found yet (took {attempt_time:.2f}s)")
+                        logger.info("Attempt %d failed: document not found yet (took %.2fs)", attempts_made, attempt_time)
                         if attempts_made < max_attempts:
                             continue
                         else:
                             break
                     
                     response.raise_for_status()
-                    sunat_doc = response.json()
+                    sunat_doc = _sunat_json(response)
                     
-                    if not isinstance(sunat_doc, dict) or not sunat_doc.get('id'):
+                    if not _is_sunat_document(sunat_doc):
                         attempt_time = time.time() - attempt_start_time
-                        print(f"❌ Attempt {attempts_made} failed: Invalid response format (took {attempt_time:.2f}s)")
+                        logger.warning("Attempt %d failed: invalid response format (took %.2fs)", attempts_made, attempt_time)
                         continue
                     
                     # Check the status from Sunat
                     sunat_status = sunat_doc.get('status', '').upper()
-                    print(f"✅ Document found! Status: {sunat_status}")
+                    logger.debug("Document found, status: %s", sunat_status)
                     
                     # Sync the document (even if status is not ACEPTADO yet)
                     synced_count, errors = process_and_sync_documents([sunat_doc], process_sunat_document)
                     
                     if synced_count > 0:
-                        # Refresh the document from database to get all updates
-                        document.refresh_from_db()
+                        document_stale = True
                         
                         # Check if status is ACEPTADO - only then we're done
                         if sunat_status == 'ACEPTADO':
                             synced_successfully = True
+                            document.refresh_from_db()
+                            document_stale = False
                             attempt_time = time.time() - attempt_start_time
                             total_time = time.time() - sync_start_time
                             
-                            print(f"\n{'='*60}")
-                            print(f"✅ SYNC SUCCESS - DOCUMENT ACCEPTED!")
-                            print(f"   Document: {document.serie}-{document.numero}")
-                            print(f"   Status: {document.sunat_status} -> {document.status}")
-                            print(f"   Amount: {document.amount}")
-                            print(f"   Attempts: {attempts_made}/{max_attempts}")
-                            print(f"   Attempt time: {attempt_time:.2f}s")
-                            print(f"   Total time: {total_time:.2f}s")
-                            print(f"{'='*60}\n")
+                            logger.info(
+                                "Sync success, document accepted: %s-%s (status %s -> %s, amount %s, "
+                                "attempts %d/%d, attempt time %.2fs, total time %.2fs)",
+                                document.serie, document.numero, document.sunat_status, document.status,
+                                document.amount, attempts_made, max_attempts, attempt_time, total_time,
+                            )
                             break
-                        elif sunat_status in ['RECHAZADO', 'EXCEPCION']:
+                        elif sunat_status in _NOT_ACCEPTED_SUNAT_STATUSES:
                             # Final status but not accepted - stop retrying
+                            document.refresh_from_db()
+                            document_stale = False
                             attempt_time = time.time() - attempt_start_time
                             total_time = time.time() - sync_start_time
-                            print(f"\n{'='*60}")
-                            print(f"⚠️  DOCUMENT NOT ACCEPTED")
-                            print(f"   Document: {document.serie}-{document.numero}")
-                            print(f"   Status: {document.sunat_status} -> {document.status}")
-                            print(f"   Attempts: {attempts_made}/{max_attempts}")
-                            print(f"   Total time: {total_time:.2f}s")
-                            print(f"{'='*60}\n")
+                            logger.warning(
+                                "Document not accepted: %s-%s (status %s -> %s, attempts %d/%d, total time %.2fs)",
+                                document.serie, document.numero, document.sunat_status, document.status,
+                                attempts_made, max_attempts, total_time,
+                            )
                             break
                         else:
                             # Status is still PENDIENTE or other - keep retrying
                             attempt_time = time.time() - attempt_start_time
-                            print(f"⏳ Status is {sunat_status}, not ACEPTADO yet. Will retry... (took {attempt_time:.2f}s)")
+                            logger.debug("Status is %s, not ACEPTADO yet; will retry (took %.2fs)", sunat_status, attempt_time)
                             if attempts_made < max_attempts:
                                 continue
                             else:
-                                print(f"⚠️  Max attempts reached. Status is still {sunat_status}, not ACEPTADO.")
+                                logger.warning("Max attempts reached; status is still %s, not ACEPTADO", sunat_status)
                                 break
                     else:
                         attempt_time = time.time() - attempt_start_time
-                        print(f"⚠️  Attempt {attempts_made} failed: Sync returned 0 documents (took {attempt_time:.2f}s)")
+                        logger.warning("Attempt %d failed: sync returned 0 documents (took %.2fs)", attempts_made, attempt_time)
                         
                 except requests.exceptions.RequestException as e:
                     attempt_time = time.time() - attempt_start_time
-                    print(f"❌ Attempt {attempts_made} failed: Network error - {str(e)} (took {attempt_time:.2f}s)")
+                    logger.warning("Attempt %d failed: network error - %s (took %.2fs)", attempts_made, e, attempt_time)
                     if attempts_made < max_attempts:
                         continue
                 except Exception as e:
                     attempt_time = time.time() - attempt_start_time
-                    print(f"❌ Attempt {attempts_made} failed: {str(e)} (took {attempt_time:.2f}s)")
+                    logger.warning("Attempt %d failed: %s (took %.2fs)", attempts_made, e, attempt_time)
                     if attempts_made < max_attempts:
                         continue
             
+            # Pick up the last synced state (still pending) for the response
+            if document_stale:
+                document.refresh_from_db()
+            
             # Final summary
             if not synced_successfully:
                 total_time = time.time() - sync_start_time
-                print(f"\n{'='*60}")
-                print(f"⚠️  SYNC FAILED (document created but not synced)")
-                print(f"   Document: {document.serie}-{document.numero}")
-                print(f"   Attempts: {attempts_made}/{len(delays)}")
-                print(f"   Total time: {total_time:.2f}s")
-                print(f"   Use /sync-single/?sunat_id={sunat_id} to retry later")
-                print(f"{'='*60}\n")
+                logger.warning(
+                    "Sync failed, document created but not synced: %s-%s (attempts %d/%d, total time %.2fs); "
+                    "use /sync-single/?sunat_id=%s to retry later",
+                    document.serie, document.numero, attempts_made, max_attempts, total_time, sunat_id,
+                )
             
             # Return created document (synced if successful)
             doc_serializer = DocumentSerializer(document)
@@ -1244,8 +1445,6 @@ class DocumentViewSet(viewsets.ModelViewSet):
             "sunat_id": "sunat-id-here"  // Sunat document ID
         }
         """
-        from django.http import HttpResponse
-        
         serializer = GeneratePDFSerializer(data=request.data)
         if not serializer.is_valid():
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -1260,7 +1459,7 @@ class DocumentViewSet(viewsets.ModelViewSet):
                 customer_name = serializer.validated_data.get('customer_name', '')
                 
                 # Generate PDF locally
-                pdf_buffer = generate_ticket_pdf(
+                pdf_buffer = _render_ticket_pdf(
                     order_items=order_items,
                     business_name="Taypa",
                     business_address="Avis Luz y Fuerza D-8",
@@ -1270,10 +1469,8 @@ class DocumentViewSet(viewsets.ModelViewSet):
                 )
                 
                 # Return PDF response
-                response = HttpResponse(pdf_buffer.getvalue(), content_type='application/pdf')
                 filename = f"ticket_{order_number or datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
-                response['Content-Disposition'] = f'inline; filename="{filename}"'
-                return response
+                return _pdf_response(pdf_buffer, filename)
             
             # Handle boleta or factura (Sunat documents) - generate PDF locally from DB data
             else:  # document_type is 'boleta' or 'factura'
@@ -1305,7 +1502,7 @@ class DocumentViewSet(viewsets.ModelViewSet):
                 # Get the Order linked to this Document (via reverse FK)
                 from store.models import Order
                 try:
-                    order = Order.objects.get(document=document)
+                    order = Order.objects.select_related('customer').get(document=document)
                 except Order.DoesNotExist:
                     return Response(
                         {'error': 'No order linked to this document. Cannot generate PDF without order items.'},
@@ -1313,11 +1510,12 @@ class DocumentViewSet(viewsets.ModelViewSet):
                     )
                 except Order.MultipleObjectsReturned:
                     # Multiple orders might be linked, get the first one
-                    order = Order.objects.filter(document=document).first()
+                    order = Order.objects.select_related('customer').filter(document=document).first()
                 
                 # Get order items from the order
                 order_items_data = []
-                for order_item in order.orderitem_set.all():
+                # dish and category are read per item; fetch them in the same query
+                for order_item in order.orderitem_set.select_related('dish', 'category'):
                     # Use dish.price as the unit price (from Dish model)
                     # OrderItem.price might store total or outdated price, so we use dish.price
                     unit_price = float(order_item.dish.price)
@@ -1340,16 +1538,18 @@ class DocumentViewSet(viewsets.ModelViewSet):
                         status=status.HTTP_400_BAD_REQUEST
                     )
                 
-                # Print order items that will go to PDF
-                print(f"\n{'='*60}")
-                print(f"📄 Generating PDF for {document_type.upper()}: {document.serie}-{document.numero}")
-                print(f"{'='*60}")
-                print(f"Order Items ({len(order_items_data)} items):")
-                for idx, item in enumerate(order_items_data, 1):
-                    item_total = item['quantity'] * item['cost']
-                    print(f"  {idx}. {item['name']}")
-                    print(f"     Quantity: {item['quantity']} x ${item['cost']:.2f} = ${item_total:.2f}")
-                print(f"{'='*60}\n")
+                # Log order items that will go to PDF
+                logger.info(
+                    "Generating PDF for %s: %s-%s (%d items)",
+                    document_type.upper(), document.serie, document.numero, len(order_items_data),
+                )
+                if logger.isEnabledFor(logging.DEBUG):
+                    for idx, item in enumerate(order_items_data, 1):
+                        item_total = item['quantity'] * item['cost']
+                        logger.debug(
+                            "%d. %s: %s x %.2f = %.2f",
+                            idx, item['name'], item['quantity'], item['cost'], item_total,
+                        )
                 
                 # Get customer name if available
                 customer_name = None
@@ -1374,22 +1574,29 @@ class DocumentViewSet(viewsets.ModelViewSet):
                 customer_address = None
                 
                 if document_type == 'factura' and document.xml_url:
-                    try:
-                        from .services import download_and_extract_xml, parse_xml_customer_info
-                        xml_content, error = download_and_extract_xml(document.xml_url)
-                        if xml_content:
-                            customer_info = parse_xml_customer_info(xml_content)
-                            customer_razon_social = customer_info.get('razon_social')
-                            customer_ruc = customer_info.get('ruc')
-                            customer_address = customer_info.get('address')
-                        else:
-                            print(f"Warning: Could not extract customer info from XML: {error}")
-                    except Exception as e:
-                        print(f"Error extracting customer info from XML: {str(e)}")
+                    cache_key = _xml_customer_cache_key(document.sunat_id)
+                    customer_info = cache.get(cache_key)
+                    if customer_info is None:
+                        try:
+                            from .services import download_and_extract_xml, parse_xml_customer_info
+                            xml_content, error = download_and_extract_xml(document.xml_url)
+                            if xml_content:
+                                customer_info = parse_xml_customer_info(xml_content)
+                                # A settled document's XML never changes; reprints skip the CDN download
+                                if document.sunat_status in _FINAL_SUNAT_STATUSES:
+                                    cache.set(cache_key, customer_info, settings.SUNAT_XML_CACHE_TTL)
+                            else:
+                                logger.warning("Could not extract customer info from XML: %s", error)
+                        except Exception:
+                            logger.exception("Error extracting customer info from XML")
+                    if customer_info:
+                        customer_razon_social = customer_info.get('razon_social')
+                        customer_ruc = customer_info.get('ruc')
+                        customer_address = customer_info.get('address')
                 
                 # Generate PDF locally using our PDF generator
                 # Don't pass order_number for boleta/factura (already shown at top)
-                pdf_buffer = generate_ticket_pdf(
+                pdf_buffer = _render_ticket_pdf(
                     order_items=order_items_data,
                     business_name="Taypa",
                     business_address="Avis Luz y Fuerza D-8",
@@ -1405,10 +1612,8 @@ class DocumentViewSet(viewsets.ModelViewSet):
                 )
                 
                 # Return PDF response
-                response = HttpResponse(pdf_buffer.getvalue(), content_type='application/pdf')
                 filename = f"{document_type}_{document.serie}-{document.numero}.pdf"
-                response['Content-Disposition'] = f'inline; filename="{filename}"'
-                return response
+                return _pdf_response(pdf_buffer, filename)
             
         except Exception as e:
             return Response(
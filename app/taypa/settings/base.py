@@ -166,6 +166,40 @@ SUNAT_API_URL = os.environ.get('SUNAT_API_URL', 'https://apisunat.com/api/docume
 SUNAT_DOCUMENTS_URL = os.environ.get('SUNAT_DOCUMENTS_URL', 'https://apisunat.com/api/documents/')
 SUNAT_PERSONA_ID = os.environ.get('SUNAT_PERSONA_ID')
 SUNAT_PERSONA_TOKEN = os.environ.get('SUNAT_PERSONA_TOKEN')
+# How long a settled (ACEPTADO/RECHAZADO) getById payload is reused by sync-single
+SUNAT_DOCUMENT_CACHE_TTL = int(os.environ.get('SUNAT_DOCUMENT_CACHE_TTL', 60))  # seconds
+# Customer info parsed from a settled document's XML (factura PDFs); the XML never changes
+SUNAT_XML_CACHE_TTL = int(os.environ.get('SUNAT_XML_CACHE_TTL', 86400))  # seconds
+# Repeated getAll calls (get-all, sync, sync-today) within this window share one Sunat request
+SUNAT_GETALL_CACHE_TTL = int(os.environ.get('SUNAT_GETALL_CACHE_TTL', 15))  # seconds
+
+# Ticket PDF generation: number of worker processes (0 = render in the request process)
+TICKET_PDF_WORKERS = int(os.environ.get('TICKET_PDF_WORKERS', 0))
+TICKET_PDF_TIMEOUT = int(os.environ.get('TICKET_PDF_TIMEOUT', 10))  # seconds
+
+# Logging: the taxes app logs Sunat syncs and PDF generation at INFO; set
+# TAXES_LOG_LEVEL=DEBUG for per-document and per-attempt detail
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'simple': {
+            'format': '%(asctime)s %(levelname)s %(name)s: %(message)s',
+        },
+    },
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+            'formatter': 'simple',
+        },
+    },
+    'loggers': {
+        'taxes': {
+            'handlers': ['console'],
+            'level': os.environ.get('TAXES_LOG_LEVEL', 'INFO'),
+        },
+    },
+}
 
 # CLOUDFLARE SETUP
 
@@ -43,6 +43,15 @@ DATABASES = {
     }
 }
 
+# Shared cache (the same Redis as the channel layer, its own database) so the
+# Sunat caches and the sync locks hold across every app worker
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": f"redis://{os.environ.get('REDIS_HOST', 'redis')}:{os.environ.get('REDIS_PORT', 6379)}/1",
+    }
+}
+
 CORS_ALLOWED_ORIGINS = ["http://localhost:5173"]
 CORS_ALLOWED_ORIGINS.extend(
     filter(None, os.environ.get("DJANGO_CORS_ALLOWED_ORIGINS", "").split(","))
@@ -0,0 +1,17 @@
+from .base import *
+
+# Test runs: pytest --ds=taypa.settings.test
+# In-memory SQLite whose tables are created straight from the models, so the
+# test database needs no server and no migration replay.
+DATABASES = {
+    "default": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": ":memory:",
+        "TEST": {
+            "MIGRATE": False,
+        },
+    }
+}
+
+# Nothing under test checks password strength; skip PBKDF2's iterations
+PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]